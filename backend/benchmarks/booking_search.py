@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Bookings search (client name / email ILIKE) over a large synthetic table, with
+the pg_trgm GIN indexes and with index scans disabled (the sequential scans the
+search did before). Each run counts the matches and fetches the first page, as
+get_bookings does.
+Usage: python benchmarks/booking_search.py [--bookings 200000] [--repeat 20] [--term smith] [--term ann]
+Needs PostgreSQL (DATABASE_URL); the synthetic bookings are rolled back afterwards.
+"""
+import argparse
+
+from harness import print_header, print_row, time_calls
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from pagination import count_rows
+from routers.bookings import bookings_filter_query, bookings_page_query
+
+FIRST_NAMES = ["Anna", "Ben", "Carla", "David", "Emma", "Felix", "Grace", "Hugo", "Iris", "Jonas"]
+LAST_NAMES = ["Smith", "Novak", "Garcia", "Muller", "Rossi", "Kowalski", "Johnson", "Silva", "Dubois", "Larsen"]
+
+# One-hour bookings an hour apart, long before any real ones, so active ones never trip excl_booking_overlap
+SEED = text("""
+    INSERT INTO bookings (client_name, client_email, start_time, end_time, status)
+    SELECT f[1 + i % 10] || ' ' || l[1 + (i / 10) % 10] || ' ' || i,
+           lower(f[1 + i % 10]) || '.' || lower(l[1 + (i / 10) % 10]) || i || '@example.com',
+           timestamptz '1900-01-01 00:00+00' + i * interval '1 hour',
+           timestamptz '1900-01-01 01:00+00' + i * interval '1 hour',
+           (ARRAY['inquiry', 'pending', 'confirmed', 'canceled'])[1 + i % 4]
+    FROM generate_series(1, :n) AS i,
+         (SELECT CAST(:first AS text[]) AS f, CAST(:last AS text[]) AS l) AS names
+""")
+
+
+def set_index_scans(db, enabled: bool) -> None:
+    value = "on" if enabled else "off"
+    db.execute(text(f"SET LOCAL enable_bitmapscan = {value}"))
+    db.execute(text(f"SET LOCAL enable_indexscan = {value}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--term", action="append", help="search term (repeatable)")
+    args = parser.parse_args()
+    terms = args.term or ["smith", "ann", "kowalski12", "@example"]
+
+    db = SessionLocal()
+    try:
+        db.execute(SEED, {"n": args.bookings, "first": FIRST_NAMES, "last": LAST_NAMES})
+        db.execute(text("ANALYZE bookings"))
+
+        print(f"{args.bookings} synthetic bookings, page of 10 plus total count per search")
+        print_header("term / plan", "matches", "mean ms", "p50 ms", "p95 ms")
+        for term in terms:
+            for label, use_indexes in (("seq scan", False), ("trigram", True)):
+                set_index_scans(db, use_indexes)
+
+                def search():
+                    query = bookings_filter_query(None, None, None, term)
+                    total = count_rows(db, query, "exact")
+                    db.scalars(bookings_page_query(query, None, "asc", 0, 10)).all()
+                    db.expunge_all()
+                    return total
+
+                total = search()
+                stats = time_calls(search, repeat=args.repeat, warmup=2)
+                print_row(f"{term} / {label}", total, stats["mean"], stats["p50"], stats["p95"])
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
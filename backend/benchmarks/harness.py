@@ -0,0 +1,66 @@
+"""
+Shared helpers for the scripts in this directory
+Run the scripts from backend/ (python benchmarks/<script>.py). Scripts that need
+PostgreSQL use DATABASE_URL like the API, write their fixtures inside one
+transaction and roll it back, so they can be pointed at a development database.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Make the backend modules importable when a script is run directly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def time_calls(func, repeat: int = 200, warmup: int = 10) -> dict:
+    """Call func repeatedly; per-call latency statistics in milliseconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+class StatementCounter:
+    """
+    Count SQL statements and the rows they returned on an engine or connection
+    Usage: with StatementCounter(engine) as counter: ...; counter.statements, counter.rows
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.statements = 0
+        self.rows = 0
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if cursor.description is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+    def __enter__(self):
+        self.statements = self.rows = 0
+        event.listen(self.target, "after_cursor_execute", self._after_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.target, "after_cursor_execute", self._after_execute)
+
+
+def print_header(*columns: str) -> None:
+    print(f"{columns[0]:<28}" + "".join(f"{column:>12}" for column in columns[1:]))
+
+
+def print_row(label: str, *values) -> None:
+    cells = "".join(f"{value:>12.2f}" if isinstance(value, float) else f"{value:>12}" for value in values)
+    print(f"{label:<28}{cells}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Cost of the admin auth dependency (routers/auth.py get_current_user_dependency)
+under repeated calls with the same token, for each JWT backend with and without
+the verified-token cache. No database needed.
+Usage: python benchmarks/jwt_verification.py [--repeat 5000]
+"""
+import argparse
+
+from harness import print_header, print_row, time_calls
+
+from routers import auth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "admin"})
+
+    print(f"{args.repeat} calls with one token")
+    print_header("backend", "cache", "mean us", "p50 us", "p95 us")
+    for backend in ("jose", "native"):
+        for cache_size in (0, auth.JWT_CACHE_SIZE or 256):
+            auth.JWT_BACKEND = backend
+            auth._verified_tokens = auth._VerifiedTokenCache(cache_size)
+
+            def verify():
+                assert auth.get_current_user_dependency(token) == "admin"
+
+            stats = time_calls(verify, repeat=args.repeat, warmup=100)
+            print_row(backend, "on" if cache_size else "off", stats["mean"] * 1000, stats["p50"] * 1000, stats["p95"] * 1000)
+
+
+if __name__ == "__main__":
+    main()
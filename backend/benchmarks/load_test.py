@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput of running API instances, e.g. the sync and the
+async (DB_ASYNC=true) database layer side by side.
+Usage: python benchmarks/load_test.py [--concurrency 50] [--requests 2000] [--path /api/posts?limit=12] URL [URL ...]
+
+Example (two instances of the same build against the same database):
+  DB_ASYNC=false uvicorn main:app --port 8000 &
+  DB_ASYNC=true  uvicorn main:app --port 8001 &
+  python benchmarks/load_test.py http://localhost:8000 http://localhost:8001
+
+Each client thread keeps one keep-alive connection. Responses are not cached
+client-side, but the API's own response cache serves repeated identical
+listings, so pass several --path values (or ?search=...) to exercise the database.
+"""
+import argparse
+import http.client
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def run(base_url: str, paths, concurrency: int, total: int) -> dict:
+    target = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+    local = threading.local()
+    next_path = itertools.cycle(paths)
+    path_lock = threading.Lock()
+
+    def request(_):
+        with path_lock:
+            path = next(next_path)
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = connection_class(target.netloc, timeout=60)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            local.conn = None
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # Warm up the connection pools (and the interpreter) before timing
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(request, range(concurrency)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(request, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "throughput": total / elapsed,
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50": quantiles[49] * 1000,
+        "p95": quantiles[94] * 1000,
+        "p99": quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+", help="API base URLs to compare")
+    parser.add_argument("--path", action="append", help="request path (repeatable; cycled through)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    paths = args.path or ["/api/posts?limit=12", "/api/categories", "/api/bookings?limit=10"]
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, paths: {', '.join(paths)}")
+    print(f"{'url':<32} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for url in args.urls:
+        result = run(url, paths, args.concurrency, args.requests)
+        print(
+            f"{url:<32} {result['throughput']:>9.1f} {result['p50']:>9.1f} "
+            f"{result['p95']:>9.1f} {result['p99']:>9.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Concurrency test: a public endpoint must stay responsive while a burst of logins
+is verifying bcrypt hashes. Serves routers/auth.py plus a trivial public route with
+uvicorn in-process and probes the public route during the burst, once against
+/api/auth/login and once against a copy of the old handler that verified the
+password on the event loop. No database needed.
+Usage: python benchmarks/login_concurrency.py [--logins 20] [--max-p95-ms 100]
+Exits with status 1 if the public route's p95 latency during the login burst exceeds --max-p95-ms.
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Before routers/auth.py reads its settings
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "benchmark-password")
+os.environ["ADMIN_PASSWORD_HASH"] = ""
+os.environ["LOGIN_RATE_LIMIT_BACKEND"] = "none"
+
+from harness import print_header, print_row
+
+import uvicorn
+from fastapi import Depends, FastAPI
+from fastapi.security import OAuth2PasswordRequestForm
+
+from routers import auth
+
+app = FastAPI()
+app.include_router(auth.router)
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+@app.post("/blocking-login")
+async def blocking_login(form_data: OAuth2PasswordRequestForm = Depends()):
+    """The former login: bcrypt on the event loop"""
+    return {"ok": auth.verify_password(form_data.password, auth.get_password_hash())}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def timed_get(url: str) -> float:
+    start = time.perf_counter()
+    urllib.request.urlopen(url, timeout=60).read()
+    return (time.perf_counter() - start) * 1000
+
+
+def post_login(url: str) -> None:
+    data = urllib.parse.urlencode({"username": os.environ["ADMIN_USERNAME"], "password": "wrong-password"}).encode()
+    try:
+        urllib.request.urlopen(url, data=data, timeout=120).read()
+    except urllib.error.HTTPError:
+        pass  # 401 is the expected answer
+
+
+def probe(base: str, login_path: str, logins: int) -> list:
+    """Ping latencies (ms) while `logins` login requests are in flight"""
+    latencies = []
+    with ThreadPoolExecutor(logins) as pool:
+        burst = [pool.submit(post_login, base + login_path) for _ in range(logins)] if login_path else []
+        time.sleep(0.05)
+        while True:
+            latencies.append(timed_get(base + "/ping"))
+            if not burst and len(latencies) >= 50:
+                break
+            if burst and all(future.done() for future in burst):
+                break
+            time.sleep(0.01)
+        for future in burst:
+            future.result()
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--max-p95-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}"
+
+    print(f"/ping latency during a burst of {args.logins} failed logins")
+    print_header("scenario", "pings", "p50 ms", "p95 ms", "max ms")
+    results = {}
+    for name, path in (("idle", None), ("/api/auth/login", "/api/auth/login"), ("bcrypt on event loop", "/blocking-login")):
+        latencies = probe(base, path, args.logins)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        results[name] = p95
+        print_row(name, len(latencies), latencies[len(latencies) // 2], p95, latencies[-1])
+    server.should_exit = True
+
+    if results["/api/auth/login"] > args.max_p95_ms:
+        print(f"FAIL: /ping p95 {results['/api/auth/login']:.1f} ms during logins exceeds {args.max_p95_ms:g} ms")
+        sys.exit(1)
+    print(f"PASS: /ping p95 stayed under {args.max_p95_ms:g} ms during logins")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Reordering a post's gallery: the former delete-all-then-reinsert media update
+against reconcile_media in routers/posts.py (match by public_id, bulk UPDATE only
+what changed). Reports statements issued, media rows that kept their id, and latency.
+Usage: python benchmarks/media_reconcile.py [--media 50] [--repeat 50]
+Needs PostgreSQL (DATABASE_URL); every run happens in a savepoint that is rolled back.
+"""
+import argparse
+import uuid
+
+from harness import StatementCounter, print_header, print_row, time_calls
+
+from sqlalchemy import select
+
+from database import SessionLocal, engine
+from models import Media, Post
+from routers.posts import insert_media, media_values, reconcile_media
+from schemas import MediaCreateInput
+
+
+def replace_all(db, post_id, existing, media_inputs):
+    """The former update_post media handling: delete every row, add fresh ones"""
+    for row in existing:
+        db.delete(row)
+    for idx, media_data in enumerate(media_inputs):
+        db.add(Media(**media_values(post_id, media_data, idx)))
+    db.flush()
+
+
+def reconcile(db, post_id, existing, media_inputs):
+    reconcile_media(db, post_id, existing, media_inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--media", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tag = uuid.uuid4().hex[:8]
+    gallery = [
+        MediaCreateInput(
+            public_id=f"bench/{tag}/{i}", secure_url=f"https://example.com/{tag}/{i}.jpg",
+            width=1920, height=1080, format="jpg", size=500000, display_order=i,
+            metadata={"source": "benchmark"}
+        )
+        for i in range(args.media)
+    ]
+    # What the admin sends back after dragging items around
+    scenarios = {
+        "swap two": [
+            item.model_copy(update={"display_order": {0: 1, 1: 0}.get(i, i)}) for i, item in enumerate(gallery)
+        ],
+        "reverse": [
+            item.model_copy(update={"display_order": args.media - 1 - i}) for i, item in enumerate(gallery)
+        ],
+    }
+
+    db = SessionLocal()
+    try:
+        post = Post(title="Benchmark gallery", status="draft")
+        db.add(post)
+        db.flush()
+        post_id = post.id
+        original_ids = {row.id for row in insert_media(db, [media_values(post_id, m, i) for i, m in enumerate(gallery)])}
+        db.expunge_all()
+
+        def run(strategy, media_inputs, counter=None):
+            savepoint = db.begin_nested()
+            existing = db.scalars(select(Media).where(Media.post_id == post_id)).all()
+            if counter is None:
+                strategy(db, post_id, existing, media_inputs)
+                kept = None
+            else:
+                with counter:
+                    strategy(db, post_id, existing, media_inputs)
+                kept = len(original_ids & set(db.scalars(select(Media.id).where(Media.post_id == post_id))))
+            savepoint.rollback()
+            db.expunge_all()
+            return kept
+
+        print(f"{args.media}-item gallery")
+        print_header("scenario / strategy", "statements", "ids kept", "mean ms", "p50 ms", "p95 ms")
+        for scenario, media_inputs in scenarios.items():
+            for name, strategy in (("replace all", replace_all), ("reconcile", reconcile)):
+                counter = StatementCounter(engine)
+                kept = run(strategy, media_inputs, counter)
+                stats = time_calls(lambda: run(strategy, media_inputs), repeat=args.repeat, warmup=3)
+                print_row(f"{scenario} / {name}", counter.statements, kept, stats["mean"], stats["p50"], stats["p95"])
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-call latency of Mux API calls against a local stub server: a new
+mux_python.ApiClient per call (as before) against the shared client from
+services/mux_service.py. The stub delays every new connection by --handshake-ms
+to stand in for the TCP + TLS setup a real api.mux.com call pays.
+Usage: python benchmarks/mux_client.py [--repeat 200] [--handshake-ms 30]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from harness import print_header, print_row, time_calls
+
+import mux_python
+
+ASSET = {
+    "data": {
+        "id": "bench-asset", "status": "ready", "duration": 12.5, "aspect_ratio": "16:9",
+        "max_stored_resolution": "HD", "playback_ids": [{"id": "bench-playback", "policy": "public"}]
+    }
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Send headers and body in one segment; split writes stall on delayed ACKs
+    wbufsize = 65536
+    disable_nagle_algorithm = True
+    handshake_seconds = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        time.sleep(self.handshake_seconds)
+
+    def do_GET(self):
+        body = json.dumps(ASSET).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    StubHandler.handshake_seconds = args.handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["MUX_TOKEN_ID"] = "bench-token-id"
+    os.environ["MUX_TOKEN_SECRET"] = "bench-token-secret"
+    from services import mux_service
+
+    def client_per_call():
+        configuration = mux_python.Configuration()
+        configuration.username = os.environ["MUX_TOKEN_ID"]
+        configuration.password = os.environ["MUX_TOKEN_SECRET"]
+        configuration.host = host
+        mux_python.AssetsApi(mux_python.ApiClient(configuration)).get_asset("bench-asset")
+
+    mux_service.get_mux_client().configuration.host = host
+
+    def shared_client():
+        mux_service.get_asset_details("bench-asset")
+
+    print(f"{args.repeat} get_asset calls, {args.handshake_ms:g} ms connection setup")
+    print_header("client", "connections", "mean ms", "p50 ms", "p95 ms")
+    for name, func in (("ApiClient per call", client_per_call), ("shared client", shared_client)):
+        StubHandler.connections = 0
+        stats = time_calls(func, repeat=args.repeat)
+        print_row(name, StubHandler.connections, stats["mean"], stats["p50"], stats["p95"])
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Rows fetched and latency of loading a page of posts with their media and categories:
+joinedload (one LEFT JOIN per collection, media x categories rows per post) against
+selectinload (one batched IN query per collection), as used by routers/posts.py.
+Usage: python benchmarks/post_loading.py [--posts 12] [--media 20] [--categories 10] [--repeat 100]
+Needs PostgreSQL (DATABASE_URL); the fixture posts are rolled back afterwards.
+"""
+import argparse
+import uuid
+
+from harness import StatementCounter, print_header, print_row, time_calls
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from database import SessionLocal, engine
+from models import Category, Media, Post
+
+
+def seed(db, posts: int, media: int, categories: int):
+    tag = uuid.uuid4().hex[:8]
+    category_rows = [Category(name=f"bench-{tag}-{i}") for i in range(categories)]
+    post_rows = []
+    for p in range(posts):
+        post = Post(title=f"Benchmark post {p}", description="x" * 200, status="published")
+        post.categories = category_rows
+        post.media = [
+            Media(
+                type="image", provider="cloudinary", public_id=f"bench/{tag}/{p}/{m}",
+                url=f"https://example.com/{tag}/{p}/{m}.jpg", width=1920, height=1080,
+                format="jpg", size=500000, meta_data={"source": "benchmark"}, display_order=m
+            )
+            for m in range(media)
+        ]
+        post_rows.append(post)
+    db.add_all(post_rows)
+    db.flush()
+    return [post.id for post in post_rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=12)
+    parser.add_argument("--media", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        post_ids = seed(db, args.posts, args.media, args.categories)
+        page = select(Post).where(Post.id.in_(post_ids)).order_by(Post.created_at.desc(), Post.id.desc()).limit(args.posts)
+        strategies = {
+            "joinedload": page.options(joinedload(Post.media), joinedload(Post.categories)),
+            "selectinload": page.options(selectinload(Post.media), selectinload(Post.categories)),
+        }
+
+        print(f"{args.posts} posts x {args.media} media x {args.categories} categories")
+        print_header("strategy", "statements", "rows", "mean ms", "p50 ms", "p95 ms")
+        for name, statement in strategies.items():
+            def load():
+                db.expunge_all()
+                posts = db.scalars(statement).unique().all()
+                assert all(len(post.media) == args.media for post in posts)
+
+            with StatementCounter(engine) as counter:
+                load()
+            stats = time_calls(load, repeat=args.repeat)
+            print_row(name, counter.statements, counter.rows, stats["mean"], stats["p50"], stats["p95"])
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Post search over a large synthetic table: the ILIKE substring match on title and
+description (search_mode=substring, the former behaviour) against the ranked
+prefix match on the GIN-indexed search_vector (search_mode=fulltext). Each run
+counts the matches and fetches the first page, as get_posts does.
+Usage: python benchmarks/post_search.py [--posts 100000] [--repeat 20] [--term sunset] [--term wedd]
+Needs PostgreSQL (DATABASE_URL); the synthetic posts are rolled back afterwards.
+"""
+import argparse
+
+from harness import print_header, print_row, time_calls
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from pagination import count_rows
+from routers.posts import posts_filter_query, posts_page_query
+
+WORDS = [
+    "sunset", "wedding", "portrait", "mountain", "studio", "documentary", "street", "ocean",
+    "festival", "fashion", "aerial", "night", "forest", "music", "travel", "family",
+    "architecture", "desert", "winter", "commercial"
+]
+
+SEED = text("""
+    INSERT INTO posts (title, description, status)
+    SELECT initcap(w[1 + i % 20]) || ' ' || w[1 + (i * 7) % 20] || ' #' || i,
+           repeat('lorem ipsum dolor sit amet ', 8) || w[1 + (i * 13) % 20] || ' ' || w[1 + (i * 17) % 20],
+           CASE WHEN i % 4 = 0 THEN 'draft' ELSE 'published' END
+    FROM generate_series(1, :n) AS i, (SELECT CAST(:words AS text[]) AS w) AS words
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--term", action="append", help="search term (repeatable)")
+    args = parser.parse_args()
+    terms = args.term or ["sunset", "wedd", "street night"]
+
+    db = SessionLocal()
+    try:
+        db.execute(SEED, {"n": args.posts, "words": WORDS})
+        db.execute(text("ANALYZE posts"))
+
+        print(f"{args.posts} synthetic posts, page of 12 plus total count per search")
+        print_header("term / mode", "matches", "mean ms", "p50 ms", "p95 ms")
+        for term in terms:
+            for mode in ("substring", "fulltext"):
+                def search():
+                    query, rank = posts_filter_query("published", None, term, mode)
+                    total = count_rows(db, query, "exact")
+                    page, _, _ = posts_page_query(query, rank, None, "desc", None, False, 0, 12)
+                    db.scalars(page).all()
+                    db.expunge_all()
+                    return total
+
+                total = search()
+                stats = time_calls(search, repeat=args.repeat, warmup=2)
+                print_row(f"{term} / {mode}", total, stats["mean"], stats["p50"], stats["p95"])
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cost of serializing a 12-post listing page with heavy media metadata:
+the former path (per-handler dict copy, PostSchema validation, response_model
+re-validation and jsonable_encoder + json.dumps) against serializers.post_to_dict
+encoded straight to bytes. Runs on transient objects; no database needed.
+Usage: python benchmarks/serialization.py [--posts 12] [--media 20] [--metadata-keys 200] [--repeat 200]
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timezone
+
+from harness import print_header, print_row, time_calls
+
+from fastapi.encoders import jsonable_encoder
+
+from models import Category, Media, Post
+from schemas import PaginatedResponse, Post as PostSchema
+from pagination import page_info
+from serializers import dumps, post_to_dict
+
+
+def make_page(posts: int, media: int, metadata_keys: int):
+    now = datetime.now(timezone.utc)
+    categories = [Category(id=uuid.uuid4(), name=f"Category {i}", created_at=now) for i in range(5)]
+    # Roughly what Cloudinary returns for an upload, padded to metadata_keys entries
+    metadata = {
+        "asset_id": uuid.uuid4().hex, "version": 1700000000, "resource_type": "image",
+        "tags": ["portfolio", "benchmark"], "colors": [["#ffffff", 12.5]] * 8,
+        **{f"field_{i}": f"value {i}" for i in range(metadata_keys)}
+    }
+    page = []
+    for p in range(posts):
+        post_id = uuid.uuid4()
+        page.append(Post(
+            id=post_id, title=f"Post {p}", description="Lorem ipsum " * 20, status="published",
+            created_at=now, updated_at=now, categories=categories,
+            media=[
+                Media(
+                    id=uuid.uuid4(), post_id=post_id, type="image", provider="cloudinary",
+                    public_id=f"portfolio/{p}/{m}", url=f"https://res.cloudinary.com/demo/{p}/{m}.jpg",
+                    width=1920, height=1080, format="jpg", size=512000, meta_data=metadata,
+                    is_featured=m == 0, display_order=m, created_at=now
+                )
+                for m in range(media)
+            ]
+        ))
+    return page
+
+
+def legacy_post_dict(post) -> dict:
+    """The dict each handler used to build before validating it through PostSchema"""
+    return {
+        'id': post.id,
+        'title': post.title,
+        'description': post.description,
+        'status': post.status,
+        'created_at': post.created_at,
+        'updated_at': post.updated_at,
+        'media': [
+            {
+                'id': m.id,
+                'post_id': m.post_id,
+                'type': m.type,
+                'provider': m.provider,
+                'public_id': m.public_id,
+                'url': m.url,
+                'duration': float(m.duration) if m.duration else None,
+                'width': m.width,
+                'height': m.height,
+                'format': m.format,
+                'size': m.size,
+                'meta_data': m.meta_data if isinstance(m.meta_data, dict) else None,
+                'is_featured': m.is_featured if hasattr(m, 'is_featured') else False,
+                'display_order': m.display_order if hasattr(m, 'display_order') else 0,
+                'created_at': m.created_at
+            }
+            for m in sorted(post.media, key=lambda x: (not (x.is_featured if hasattr(x, 'is_featured') else False), x.display_order if hasattr(x, 'display_order') else 0))
+        ],
+        'categories': [{'id': c.id, 'name': c.name, 'created_at': c.created_at} for c in post.categories]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=12)
+    parser.add_argument("--media", type=int, default=20)
+    parser.add_argument("--metadata-keys", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    page = make_page(args.posts, args.media, args.metadata_keys)
+    info = page_info(0, args.posts, args.posts)
+
+    def validated():
+        items = [PostSchema(**legacy_post_dict(post)) for post in page]
+        # What FastAPI does with response_model: validate again, then encode
+        response = PaginatedResponse[PostSchema].model_validate({"items": items, **info})
+        return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+    def direct():
+        return dumps({"items": [post_to_dict(post) for post in page], **info})
+
+    print(f"{args.posts} posts x {args.media} media, {args.metadata_keys} extra metadata keys per media item")
+    print_header("path", "bytes", "mean ms", "p50 ms", "p95 ms")
+    for name, func in (("validated (before)", validated), ("post_to_dict + dumps", direct)):
+        size = len(func())
+        stats = time_calls(func, repeat=args.repeat)
+        print_row(name, size, stats["mean"], stats["p50"], stats["p95"])
+
+
+if __name__ == "__main__":
+    main()
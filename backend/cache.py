@@ -0,0 +1,281 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlencode
+
+from anyio import to_thread
+from fastapi.responses import Response
+
+from serializers import dumps
+from metrics import Counter
+
+# Response cache configuration
+# RESPONSE_CACHE_BACKEND: "memory" (per worker), "sqlite" (shared by all workers on the host) or "none"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "/tmp/portfolio_response_cache.sqlite3")
+
+
+class CacheBackend:
+    """
+    Storage interface for cached response bodies
+    """
+
+    # True when get()/set()/delete_prefix() do I/O and must not run on the event loop
+    blocking = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        self.delete_prefix("")
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU with per-entry TTL and a bound on the number of entries
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache stored in a local SQLite file so every uvicorn worker on the host
+    sees the same entries and invalidations (stand-in for a shared store such as Redis)
+    """
+
+    # File I/O, and writes can wait up to the connection timeout for another worker's lock
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache(accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl, now)
+        )
+        conn.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        self._conn().execute(
+            "DELETE FROM response_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Read-through cache of JSON response bodies, keyed by namespace + query parameters
+    Keeps hit/miss counters per namespace
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = Counter("response_cache_hits_total", "Response cache hits", ["namespace"])
+        self.misses = Counter("response_cache_misses_total", "Response cache misses", ["namespace"])
+
+    @property
+    def blocking(self) -> bool:
+        return self.backend is not None and self.backend.blocking
+
+    @staticmethod
+    def key(namespace: str, params=None, version: str = "") -> str:
+        """
+        Build a cache key from a namespace, the full set of query parameters and
+        the current validator (ETag) of the underlying rows, so an entry is never
+        served once the data it was built from has changed, even by another process
+        """
+        query = ""
+        if params:
+            items = params.multi_items() if hasattr(params, "multi_items") else params.items()
+            # Percent-encoded, so values containing & or = can't collide with other queries
+            query = urlencode(sorted(items))
+        return f"{namespace}:{query}#{version}"
+
+    def lookup(self, namespace: str, key: str) -> Optional[Response]:
+        """Return a response with the cached body for key, or None on a miss"""
+        if self.backend is None:
+            return None
+        body = self.backend.get(key)
+        if body is None:
+            self.misses.inc(namespace)
+            return None
+        self.hits.inc(namespace)
+        return Response(content=body, media_type="application/json")
+
+    def store(self, key: str, content) -> Response:
+        """Encode content, cache the body under key and return it as a response"""
+        body = dumps(content)
+        if self.backend is not None:
+            self.backend.set(key, body, self.ttl)
+        return Response(content=body, media_type="application/json")
+
+    async def lookup_async(self, namespace: str, key: str) -> Optional[Response]:
+        """lookup() for async handlers; blocking backends run in a worker thread"""
+        if self.blocking:
+            return await to_thread.run_sync(self.lookup, namespace, key)
+        return self.lookup(namespace, key)
+
+    async def store_async(self, key: str, content) -> Response:
+        """store() for async handlers; blocking backends run in a worker thread"""
+        if self.blocking:
+            return await to_thread.run_sync(self.store, key, content)
+        return self.store(key, content)
+
+    def invalidate(self, prefix: str) -> None:
+        if self.backend is not None:
+            self.backend.delete_prefix(prefix)
+
+    def stats(self) -> dict:
+        return {
+            "backend": RESPONSE_CACHE_BACKEND,
+            "ttl": self.ttl,
+            "entries": self.backend.size() if self.backend is not None else 0,
+            "hits": {key[0]: value for key, value in self.hits.snapshot().items()},
+            "misses": {key[0]: value for key, value in self.misses.snapshot().items()},
+        }
+
+
+def _create_backend() -> Optional[CacheBackend]:
+    if RESPONSE_CACHE_BACKEND == "none":
+        return None
+    if RESPONSE_CACHE_BACKEND == "sqlite":
+        return SQLiteCacheBackend(RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_ENTRIES)
+    return MemoryCacheBackend(RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend(), RESPONSE_CACHE_TTL)
+
+
+# Cache namespaces
+POSTS_LIST = "posts"
+POST_DETAIL = "post"
+CATEGORIES_LIST = "categories"
+
+
+def post_detail_key(post_id, version: str = "") -> str:
+    return ResponseCache.key(f"{POST_DETAIL}/{post_id}", version=version)
+
+
+def invalidate_posts(post_id=None) -> None:
+    """
+    Drop cached post listings, plus the detail entry for post_id
+    (or every post detail when post_id is None)
+    """
+    response_cache.invalidate(f"{POSTS_LIST}:")
+    if post_id is not None:
+        response_cache.invalidate(f"{POST_DETAIL}/{post_id}:")
+    else:
+        response_cache.invalidate(f"{POST_DETAIL}/")
+
+
+def invalidate_categories() -> None:
+    """Drop cached category listings"""
+    response_cache.invalidate(f"{CATEGORIES_LIST}:")
+
+
+async def invalidate_posts_async(post_id=None) -> None:
+    """invalidate_posts() for async handlers; blocking backends run in a worker thread"""
+    if response_cache.blocking:
+        await to_thread.run_sync(invalidate_posts, post_id)
+    else:
+        invalidate_posts(post_id)
+
+
+async def invalidate_categories_async() -> None:
+    """invalidate_categories() for async handlers; blocking backends run in a worker thread"""
+    if response_cache.blocking:
+        await to_thread.run_sync(invalidate_categories)
+    else:
+        invalidate_categories()
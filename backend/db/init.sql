@@ -1,5 +1,7 @@
 -- Create UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram indexes for bookings search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Create posts table
 CREATE TABLE IF NOT EXISTS posts (
@@ -8,7 +10,12 @@ CREATE TABLE IF NOT EXISTS posts (
     description TEXT,
     status VARCHAR DEFAULT 'draft' CHECK (status IN ('draft', 'published')),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Full-text search document ('simple' config: no stemming, works for any language)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
 );
 
 -- Create media table
@@ -61,29 +68,52 @@ CREATE TABLE IF NOT EXISTS bookings (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     client_name VARCHAR NOT NULL,
     client_email VARCHAR NOT NULL,
-    start_time TIMESTAMP NOT NULL,
-    end_time TIMESTAMP NOT NULL,
-    status VARCHAR DEFAULT 'pending' CHECK (status IN ('pending', 'confirmed', 'canceled')),
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    -- 'inquiry' = contact form message: listed with bookings but never holds its time slot
+    status VARCHAR DEFAULT 'pending' CONSTRAINT check_booking_status CHECK (status IN ('inquiry', 'pending', 'confirmed', 'canceled')),
     message TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Half-open [start_time, end_time) range used for overlap checks and availability
+    time_range TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_time, end_time, '[)')) STORED,
+    -- No two active (pending/confirmed) bookings may overlap; inquiries and canceled bookings
+    -- are ignored. The GiST index also serves overlap queries
+    CONSTRAINT excl_booking_overlap EXCLUDE USING gist (time_range WITH &&)
+        WHERE (status IN ('pending', 'confirmed'))
 );
 
 -- Add message column if it doesn't exist (for existing databases)
 ALTER TABLE bookings 
 ADD COLUMN IF NOT EXISTS message TEXT;
 
--- Create unique index to prevent overlapping bookings
-CREATE UNIQUE INDEX IF NOT EXISTS uniq_booking_time 
-ON bookings (start_time, end_time) 
-WHERE status IN ('pending', 'confirmed');
+-- Create jobs table (background work run by worker.py)
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 8,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_pending_run_at ON jobs(run_at) WHERE status = 'pending';
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_posts_status ON posts(status);
 CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_search_vector ON posts USING GIN (search_vector);
 CREATE INDEX IF NOT EXISTS idx_media_post_id ON media(post_id);
+CREATE INDEX IF NOT EXISTS idx_post_categories_category_post ON post_categories(category_id, post_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
 CREATE INDEX IF NOT EXISTS idx_bookings_start_time ON bookings(start_time);
+CREATE INDEX IF NOT EXISTS idx_bookings_client_name_trgm ON bookings USING GIN (client_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_bookings_client_email_trgm ON bookings USING GIN (client_email gin_trgm_ops);
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -101,3 +131,47 @@ CREATE TRIGGER update_posts_updated_at BEFORE UPDATE ON posts
 CREATE TRIGGER update_bookings_updated_at BEFORE UPDATE ON bookings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Posts per category (total and published), recomputed by the API for the
+-- categories each post write touches
+CREATE TABLE IF NOT EXISTS category_post_counts (
+    category_id UUID PRIMARY KEY REFERENCES categories(id) ON DELETE CASCADE,
+    post_count BIGINT NOT NULL DEFAULT 0,
+    published_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Version of everything the post and category listings show (their ETag), bumped
+-- once per committing transaction that writes posts, media, categories or post_categories
+CREATE TABLE IF NOT EXISTS content_version (
+    id INTEGER PRIMARY KEY CONSTRAINT check_content_version_single_row CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO content_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_content_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Once per transaction, however many rows it wrote
+    IF coalesce(current_setting('portfolio.content_version_bumped', true), '') <> 'on' THEN
+        PERFORM set_config('portfolio.content_version_bumped', 'on', true);
+        UPDATE content_version SET version = version + 1 WHERE id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Deferred to commit, so writers only hold the version row lock while committing
+CREATE CONSTRAINT TRIGGER bump_content_version_posts AFTER INSERT OR UPDATE OR DELETE ON posts
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+CREATE CONSTRAINT TRIGGER bump_content_version_media AFTER INSERT OR UPDATE OR DELETE ON media
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+CREATE CONSTRAINT TRIGGER bump_content_version_categories AFTER INSERT OR UPDATE OR DELETE ON categories
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+CREATE CONSTRAINT TRIGGER bump_content_version_post_categories AFTER INSERT OR UPDATE OR DELETE ON post_categories
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
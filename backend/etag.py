@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a weak ETag from the parts of a cheap validator query
+    (row counts, max timestamps, ...)
+    """
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    Return a 304 response if the request's If-None-Match / If-Modified-Since
+    headers match the current validators, otherwise None
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: ignore the W/ prefix on either side
+        current = etag[2:] if etag.startswith("W/") else etag
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if "*" in tags or any((t[2:] if t.startswith("W/") else t) == current for t in tags):
+            return Response(status_code=304, headers=_validator_headers(etag, last_modified))
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        # HTTP dates have one-second resolution
+        if _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since):
+            return Response(status_code=304, headers=_validator_headers(etag, last_modified))
+    return None
+
+
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Attach ETag / Last-Modified headers to a full response"""
+    response.headers.update(_validator_headers(etag, last_modified))
+    return response
@@ -2,7 +2,11 @@
 """
 Script to generate password hash for admin authentication.
 Usage: python generate_password_hash.py <password>
+
+The password is SHA256-hashed before bcrypt, matching routers/auth.py
+(bcrypt only uses the first 72 bytes of its input).
 """
+import hashlib
 import sys
 from passlib.context import CryptContext
 
@@ -15,7 +19,7 @@ if len(sys.argv) < 2:
     sys.exit(1)
 
 password = sys.argv[1]
-password_hash = pwd_context.hash(password)
+password_hash = pwd_context.hash(hashlib.sha256(password.encode('utf-8')).hexdigest())
 
 print("\n" + "="*60)
 print("Password Hash Generated:")
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from database import engine
+from database import engine, DB_ASYNC
 from models import Base
-from routers import posts, media, categories, bookings, upload, auth
+from metrics import MetricsMiddleware, render_latest
+from routers import posts, posts_async, media, media_async, categories, categories_async, bookings, bookings_async, upload, auth, admin, webhooks
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -19,15 +21,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (outermost, so CORS preflights and errors are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
+# With DB_ASYNC, routers that have an async variant use it; upload, admin and webhooks
+# stay on sync handlers (run in the threadpool) as they mostly wait on provider APIs
 app.include_router(auth.router)
-app.include_router(posts.router)
-app.include_router(media.router)
-app.include_router(categories.router)
-app.include_router(bookings.router)
+app.include_router(posts_async.router if DB_ASYNC else posts.router)
+app.include_router(media_async.router if DB_ASYNC else media.router)
+app.include_router(categories_async.router if DB_ASYNC else categories.router)
+app.include_router(bookings_async.router if DB_ASYNC else bookings.router)
 app.include_router(upload.router)
+app.include_router(admin.router)
+app.include_router(webhooks.router)
 
 
 @app.get("/")
 def root():
     return {"message": "Portfolio API is running"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
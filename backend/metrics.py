@@ -0,0 +1,215 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Every metric registers itself here and is rendered by render_latest()
+REGISTRY: List["_Metric"] = []
+
+
+class _Metric:
+    """
+    Base class for in-process metrics with optional labels
+    Values are kept per worker process
+    """
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labelvalues: Tuple) -> Tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labelvalues)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self) -> Dict[Tuple, dict]:
+        """Cumulative bucket counts per label set"""
+        result = {}
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = []
+                running = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    running += c
+                    cumulative.append((bound, running))
+                result[key] = {"buckets": cumulative, "sum": total, "count": count}
+        return result
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_latest() -> str:
+    """Render every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        if isinstance(metric, Histogram):
+            for key, data in sorted(metric.snapshot().items()):
+                for bound, count in data["buckets"]:
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{metric.name}_bucket{_labels(metric.labelnames, key, le)} {count}")
+                lines.append(f"{metric.name}_sum{_labels(metric.labelnames, key)} {_number(data['sum'])}")
+                lines.append(f"{metric.name}_count{_labels(metric.labelnames, key)} {data['count']}")
+        else:
+            for key, value in sorted(metric.snapshot().items()):
+                lines.append(f"{metric.name}{_labels(metric.labelnames, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# HTTP server metrics
+SIZE_BUCKETS = (100, 1000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+http_requests = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+http_response_size = Histogram("http_response_size_bytes", "HTTP response body size", ["method", "route"], SIZE_BUCKETS)
+http_request_errors = Counter("http_request_errors_total", "HTTP requests that failed with a 5xx or an exception", ["method", "route"])
+
+# Outbound provider calls made from services/
+provider_request_duration = Histogram(
+    "provider_request_duration_seconds", "Latency of Cloudinary / Mux API calls", ["provider", "operation"]
+)
+provider_request_errors = Counter(
+    "provider_request_errors_total", "Cloudinary / Mux API calls that raised", ["provider", "operation"]
+)
+
+
+@contextmanager
+def provider_call(provider: str, operation: str):
+    """Record latency and failures of an outbound provider call made inside the block"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        provider_request_errors.inc(provider, operation)
+        raise
+    finally:
+        provider_request_duration.observe(time.perf_counter() - start, provider, operation)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts, latency, response sizes and errors
+    Routes are labelled by their path template (e.g. /api/posts/{post_id}) to bound cardinality
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            http_requests.inc(method, route_path, status_code)
+            http_request_duration.observe(time.perf_counter() - start, method, route_path)
+            http_response_size.observe(size, method, route_path)
+            if status_code >= 500:
+                http_request_errors.inc(method, route_path)
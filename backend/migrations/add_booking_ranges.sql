@@ -0,0 +1,51 @@
+-- Migration: Range-based overlap protection for bookings
+-- Replaces uniq_booking_time (which only rejected identical start/end pairs) with an
+-- exclusion constraint over a generated tstzrange column
+
+-- Generated range columns need timestamptz; existing values are taken as UTC
+ALTER TABLE bookings
+    ALTER COLUMN start_time TYPE TIMESTAMPTZ USING start_time AT TIME ZONE 'UTC',
+    ALTER COLUMN end_time TYPE TIMESTAMPTZ USING end_time AT TIME ZONE 'UTC';
+
+ALTER TABLE bookings
+ADD COLUMN IF NOT EXISTS time_range TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_time, end_time, '[)')) STORED;
+
+DROP INDEX IF EXISTS uniq_booking_time;
+
+-- The contact form stored its messages as pending bookings for [sent, sent + 1h), which
+-- routinely overlap. Those become inquiries, which the constraint ignores
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_status_check;
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS check_booking_status;
+ALTER TABLE bookings ADD CONSTRAINT check_booking_status
+    CHECK (status IN ('inquiry', 'pending', 'confirmed', 'canceled'));
+
+UPDATE bookings SET status = 'inquiry'
+WHERE status = 'pending'
+  AND message IS NOT NULL
+  AND end_time - start_time = interval '1 hour'
+  AND start_time BETWEEN created_at - interval '1 hour' AND created_at + interval '1 hour';
+
+-- Any remaining overlaps are between real pending/confirmed bookings: keep the earliest
+-- created of each conflicting group and flag the others as inquiries for the admin to review
+DO $$
+DECLARE
+    b RECORD;
+BEGIN
+    CREATE TEMP TABLE kept_booking_ranges (time_range TSTZRANGE) ON COMMIT DROP;
+    FOR b IN
+        SELECT id, time_range FROM bookings
+        WHERE status IN ('pending', 'confirmed')
+        ORDER BY created_at, id
+    LOOP
+        IF EXISTS (SELECT 1 FROM kept_booking_ranges k WHERE k.time_range && b.time_range) THEN
+            UPDATE bookings SET status = 'inquiry' WHERE id = b.id;
+            RAISE NOTICE 'Booking % overlaps an earlier booking; status set to inquiry for review', b.id;
+        ELSE
+            INSERT INTO kept_booking_ranges VALUES (b.time_range);
+        END IF;
+    END LOOP;
+END $$;
+
+ALTER TABLE bookings
+ADD CONSTRAINT excl_booking_overlap EXCLUDE USING gist (time_range WITH &&)
+    WHERE (status IN ('pending', 'confirmed'));
@@ -0,0 +1,8 @@
+-- Migration: Trigram indexes for bookings search
+-- get_bookings searches client_name / client_email with ILIKE '%term%', which btree indexes cannot serve
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- CONCURRENTLY avoids blocking bookings writes while the indexes build (cannot run inside a transaction)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bookings_client_name_trgm ON bookings USING GIN (client_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bookings_client_email_trgm ON bookings USING GIN (client_email gin_trgm_ops);
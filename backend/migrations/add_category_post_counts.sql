@@ -0,0 +1,24 @@
+-- Migration: Category post counts
+-- (the API also creates these on startup via create_all if they are missing)
+
+-- post_categories' primary key (post_id, category_id) can't serve lookups by category
+CREATE INDEX IF NOT EXISTS idx_post_categories_category_post ON post_categories(category_id, post_id);
+
+-- Posts per category (total and published), recomputed by the API for the
+-- categories each post write touches
+CREATE TABLE IF NOT EXISTS category_post_counts (
+    category_id UUID PRIMARY KEY REFERENCES categories(id) ON DELETE CASCADE,
+    post_count BIGINT NOT NULL DEFAULT 0,
+    published_count BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO category_post_counts (category_id, post_count, published_count)
+SELECT c.id,
+       count(p.id),
+       count(p.id) FILTER (WHERE p.status = 'published')
+FROM categories c
+LEFT JOIN post_categories pc ON pc.category_id = c.id
+LEFT JOIN posts p ON p.id = pc.post_id
+GROUP BY c.id
+ON CONFLICT (category_id) DO UPDATE
+SET post_count = EXCLUDED.post_count, published_count = EXCLUDED.published_count;
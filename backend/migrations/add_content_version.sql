@@ -0,0 +1,41 @@
+-- Migration: Content version for the post and category listing ETags
+-- (the API also creates these on startup via create_all if they are missing)
+-- Replaces the count()/max(updated_at) scans of posts and categories run on every listing request
+
+-- Version of everything the post and category listings show (their ETag), bumped
+-- once per committing transaction that writes posts, media, categories or post_categories
+CREATE TABLE IF NOT EXISTS content_version (
+    id INTEGER PRIMARY KEY CONSTRAINT check_content_version_single_row CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO content_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_content_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Once per transaction, however many rows it wrote
+    IF coalesce(current_setting('portfolio.content_version_bumped', true), '') <> 'on' THEN
+        PERFORM set_config('portfolio.content_version_bumped', 'on', true);
+        UPDATE content_version SET version = version + 1 WHERE id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Deferred to commit, so writers only hold the version row lock while committing
+DROP TRIGGER IF EXISTS bump_content_version_posts ON posts;
+CREATE CONSTRAINT TRIGGER bump_content_version_posts AFTER INSERT OR UPDATE OR DELETE ON posts
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS bump_content_version_media ON media;
+CREATE CONSTRAINT TRIGGER bump_content_version_media AFTER INSERT OR UPDATE OR DELETE ON media
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS bump_content_version_categories ON categories;
+CREATE CONSTRAINT TRIGGER bump_content_version_categories AFTER INSERT OR UPDATE OR DELETE ON categories
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS bump_content_version_post_categories ON post_categories;
+CREATE CONSTRAINT TRIGGER bump_content_version_post_categories AFTER INSERT OR UPDATE OR DELETE ON post_categories
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version();
@@ -0,0 +1,11 @@
+-- Migration: Add full-text search to posts
+-- Replaces the ILIKE scans of get_posts' search with an indexed tsvector match
+
+-- Generated column: PostgreSQL keeps it in sync with title/description (rewrites the table once)
+ALTER TABLE posts
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_posts_search_vector ON posts USING GIN (search_vector);
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Text, Integer, BigInteger, Numeric, ForeignKey, Table, CheckConstraint, Boolean
-from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
+from sqlalchemy import DDL, event, Column, String, Text, Integer, BigInteger, Numeric, ForeignKey, Table, CheckConstraint, Boolean, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP, TSVECTOR, TSTZRANGE, ExcludeConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 import uuid
 from database import Base
 
@@ -10,7 +10,9 @@ post_categories = Table(
     'post_categories',
     Base.metadata,
     Column('post_id', UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
-    Column('category_id', UUID(as_uuid=True), ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    Column('category_id', UUID(as_uuid=True), ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key only serves lookups by post; this one serves per-category lookups and counts
+    Index('idx_post_categories_category_post', 'category_id', 'post_id')
 )
 
 class Post(Base):
@@ -22,6 +24,13 @@ class Post(Base):
     status = Column(String, default='draft')
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Full-text search document maintained by PostgreSQL; title ranks above description.
+    # Deferred so regular post queries never load it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
     
     # Relationships
     media = relationship("Media", back_populates="post", cascade="all, delete-orphan")
@@ -29,7 +38,11 @@ class Post(Base):
     
     __table_args__ = (
         CheckConstraint("status IN ('draft', 'published')", name='check_post_status'),
+        Index('idx_posts_search_vector', 'search_vector', postgresql_using='gin'),
     )
+    # Fetch server-generated values (created_at, updated_at) with RETURNING at flush
+    # instead of a separate SELECT when the response is built
+    __mapper_args__ = {"eager_defaults": True}
 
 class Media(Base):
     __tablename__ = "media"
@@ -79,8 +92,116 @@ class Booking(Base):
     message = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Half-open [start_time, end_time) range maintained by PostgreSQL, used for overlap checks
+    time_range = deferred(Column(TSTZRANGE, Computed("tstzrange(start_time, end_time, '[)')", persisted=True)))
     
     __table_args__ = (
-        CheckConstraint("status IN ('pending', 'confirmed', 'canceled')", name='check_booking_status'),
+        # 'inquiry' = contact form message: listed with bookings but never holds its time slot
+        CheckConstraint("status IN ('inquiry', 'pending', 'confirmed', 'canceled')", name='check_booking_status'),
+        # No two active bookings may overlap; the GiST index behind it also serves overlap queries
+        ExcludeConstraint(
+            ('time_range', '&&'),
+            name='excl_booking_overlap',
+            using='gist',
+            where="status IN ('pending', 'confirmed')"
+        ),
+        # Trigram indexes let ILIKE '%term%' searches avoid sequential scans
+        Index('idx_bookings_client_name_trgm', 'client_name', postgresql_using='gin', postgresql_ops={'client_name': 'gin_trgm_ops'}),
+        Index('idx_bookings_client_email_trgm', 'client_email', postgresql_using='gin', postgresql_ops={'client_email': 'gin_trgm_ops'}),
     )
 
+
+# The trigram operator classes come from the pg_trgm extension
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+class Job(Base):
+    """Background job executed by worker.py (provider cleanup, Mux asset resolution)"""
+    __tablename__ = "jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String, nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=8)
+    run_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())  # Not picked up before this time (retry backoff)
+    locked_at = Column(TIMESTAMP(timezone=True))  # Set while a worker is running the job
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'running', 'done', 'failed')", name='check_job_status'),
+        Index('idx_jobs_pending_run_at', 'run_at', postgresql_where=(status == 'pending')),
+    )
+
+
+# Posts per category, kept up to date by the API: every write that can change a
+# category's counts recomputes that category's row in the same transaction
+# (routers/categories.py: refresh_category_counts)
+category_post_counts = Table(
+    'category_post_counts',
+    Base.metadata,
+    Column('category_id', UUID(as_uuid=True), ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+    Column('post_count', BigInteger, nullable=False, server_default='0'),
+    Column('published_count', BigInteger, nullable=False, server_default='0')
+)
+
+# Fill in the counts when create_all adds the table to a database that already has posts
+event.listen(category_post_counts, "after_create", DDL("""
+INSERT INTO category_post_counts (category_id, post_count, published_count)
+SELECT c.id,
+       count(p.id),
+       count(p.id) FILTER (WHERE p.status = 'published')
+FROM categories c
+LEFT JOIN post_categories pc ON pc.category_id = c.id
+LEFT JOIN posts p ON p.id = pc.post_id
+GROUP BY c.id
+"""))
+
+
+# Version of everything the post and category listings show, used as their ETag
+# instead of counting and scanning posts and categories on every request. Bumped once
+# per committing transaction that wrote posts, media, categories or post_categories,
+# by deferred triggers, so writes from the API, webhooks and worker.py all count
+content_version = Table(
+    'content_version',
+    Base.metadata,
+    Column('id', Integer, primary_key=True),
+    Column('version', BigInteger, nullable=False, server_default='0'),
+    CheckConstraint('id = 1', name='check_content_version_single_row')
+)
+
+# Runs after every create_all, once all tables exist; only creates what is missing
+event.listen(Base.metadata, "after_create", DDL("""
+INSERT INTO content_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'bump_content_version') THEN
+        CREATE FUNCTION bump_content_version()
+        RETURNS TRIGGER AS $body$
+        BEGIN
+            -- Once per transaction, however many rows it wrote
+            IF coalesce(current_setting('portfolio.content_version_bumped', true), '') <> 'on' THEN
+                PERFORM set_config('portfolio.content_version_bumped', 'on', true);
+                UPDATE content_version SET version = version + 1 WHERE id = 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $body$ LANGUAGE plpgsql;
+    END IF;
+    FOREACH t IN ARRAY ARRAY['posts', 'media', 'categories', 'post_categories'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'bump_content_version_' || t) THEN
+            EXECUTE format(
+                'CREATE CONSTRAINT TRIGGER %%I AFTER INSERT OR UPDATE OR DELETE ON %%I '
+                'DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_content_version()',
+                'bump_content_version_' || t, t
+            );
+        END IF;
+    END LOOP;
+END $$;
+"""))
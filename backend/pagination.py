@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cache import MemoryCacheBackend
+
+# count_mode values accepted by list endpoints:
+# exact (COUNT(*)), estimated (planner row estimate), cached (exact, reused for
+# COUNT_CACHE_TTL seconds per filter) and none (no total)
+COUNT_MODES = ("exact", "estimated", "cached", "none")
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))  # seconds
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "1024"))
+
+_count_cache = MemoryCacheBackend(COUNT_CACHE_MAX_ENTRIES)
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: uuid.UUID) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort_key, value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, is_datetime: bool = False) -> Tuple[Any, uuid.UUID]:
+    """
+    Decode a keyset cursor, returning (sort value, row id)
+    Raises 400 if the cursor is malformed or was built for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_key, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if cursor_sort_key != sort_key:
+            raise ValueError("cursor sort mismatch")
+        # Cursors come from clients: only accept the types encode_cursor produces
+        if not isinstance(value, str) or not isinstance(row_id, str):
+            raise ValueError("invalid cursor values")
+        if is_datetime:
+            value = datetime.fromisoformat(value)
+        return value, uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_filter(sort_column, id_column, value: Any, row_id: uuid.UUID, descending: bool):
+    """
+    Filter for rows strictly after (value, row_id) in the given order
+    The leading range condition on sort_column alone keeps the single-column
+    index usable; the OR breaks ties on the primary key
+    """
+    if descending:
+        return and_(
+            sort_column <= value,
+            or_(sort_column < value, id_column < row_id)
+        )
+    return and_(
+        sort_column >= value,
+        or_(sort_column > value, id_column > row_id)
+    )
+
+
+def page_info(skip: int, limit: int, total: Optional[int]) -> dict:
+    """
+    Offset pagination fields for PaginatedResponse
+    """
+    page = (skip // limit) + 1 if limit > 0 else 1
+    if total is None:
+        total_pages = None
+    else:
+        total_pages = (total + limit - 1) // limit if limit > 0 else 1
+    return {
+        'total': total,
+        'page': page,
+        'page_size': limit,
+        'total_pages': total_pages
+    }
+
+
+def _statement(query):
+    """The SELECT behind an ORM Query; 2.0-style select() statements pass through"""
+    return getattr(query, "statement", query)
+
+
+def _compiled_sql(db, query) -> Tuple[str, Any]:
+    """Render a query to the driver's SQL string and parameters (sync or async session)"""
+    compiled = _statement(query).compile(dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        # e.g. asyncpg's $1, $2 placeholders
+        params = tuple(params[name] for name in compiled.positiontup)
+    return str(compiled), params
+
+
+def _plan_rows(plan) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count_statement(query):
+    return select(func.count()).select_from(_statement(query).order_by(None).subquery())
+
+
+def _check_count_mode(count_mode: str) -> None:
+    if count_mode not in COUNT_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"count_mode must be one of: {', '.join(COUNT_MODES)}"
+        )
+
+
+def _count_cache_key(db, query) -> str:
+    sql, params = _compiled_sql(db, query)
+    return hashlib.sha1(repr((sql, params)).encode("utf-8")).hexdigest()
+
+
+def estimate_rows(db: Session, query) -> int:
+    """Row count the PostgreSQL planner expects query to return (from table statistics)"""
+    sql, params = _compiled_sql(db, query)
+    return _plan_rows(db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar())
+
+
+def count_rows(db: Session, query, count_mode: str = "exact") -> Optional[int]:
+    """
+    Total for a paginated listing according to count_mode (see COUNT_MODES)
+    query is the filtered listing query (ORM Query or select()) before ordering, limit and offset
+    """
+    _check_count_mode(count_mode)
+    if count_mode == "none":
+        return None
+    if count_mode == "estimated":
+        return estimate_rows(db, query)
+    key = _count_cache_key(db, query) if count_mode == "cached" else None
+    if key is not None:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            return int(cached)
+    total = db.scalar(_count_statement(query))
+    if key is not None:
+        _count_cache.set(key, str(total).encode("ascii"), COUNT_CACHE_TTL)
+    return total
+
+
+async def estimate_rows_async(db: AsyncSession, query) -> int:
+    sql, params = _compiled_sql(db, query)
+    connection = await db.connection()
+    return _plan_rows((await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params)).scalar())
+
+
+async def count_rows_async(db: AsyncSession, query, count_mode: str = "exact") -> Optional[int]:
+    """count_rows for async handlers"""
+    _check_count_mode(count_mode)
+    if count_mode == "none":
+        return None
+    if count_mode == "estimated":
+        return await estimate_rows_async(db, query)
+    key = _count_cache_key(db, query) if count_mode == "cached" else None
+    if key is not None:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            return int(cached)
+    total = await db.scalar(_count_statement(query))
+    if key is not None:
+        _count_cache.set(key, str(total).encode("ascii"), COUNT_CACHE_TTL)
+    return total
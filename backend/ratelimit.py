@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Tuple
+
+from anyio import to_thread
+from fastapi import Request
+
+from metrics import Counter
+
+# Login throttling configuration
+# LOGIN_RATE_LIMIT_BACKEND: "memory" (per worker), "sqlite" (shared by all workers on the host) or "none"
+LOGIN_RATE_LIMIT_BACKEND = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory").lower()
+LOGIN_RATE_LIMIT_WINDOW = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "300"))  # seconds
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "20"))
+LOGIN_RATE_LIMIT_PER_USERNAME = int(os.getenv("LOGIN_RATE_LIMIT_PER_USERNAME", "10"))
+LOGIN_RATE_LIMIT_PATH = os.getenv("LOGIN_RATE_LIMIT_PATH", "/tmp/portfolio_rate_limit.sqlite3")
+# Take the client IP from X-Real-IP (set by nginx) instead of the socket peer
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+
+login_attempts = Counter("login_attempts_total", "Login attempts that passed the rate limiter")
+login_rate_limited = Counter("login_rate_limited_total", "Login attempts rejected by the rate limiter", ["scope"])
+
+
+class RateLimitBackend:
+    """
+    Sliding-window attempt log
+    hit() records an attempt for key unless `limit` attempts already happened
+    within the last `window` seconds
+    """
+
+    # True when hit()/reset() do I/O and must not run on the event loop
+    blocking = False
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        """Returns (allowed, seconds until the next attempt would be allowed)"""
+        raise NotImplementedError
+
+    def reset(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process attempt timestamps per key
+    The number of tracked keys is bounded; the least recently used are dropped first
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._attempts: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = deque()
+                self._attempts[key] = attempts
+            self._attempts.move_to_end(key)
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            if len(attempts) >= limit:
+                return False, attempts[0] + window - now
+            attempts.append(now)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+            return True, 0.0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Attempt log stored in a local SQLite file so every uvicorn worker on the host
+    shares the same limits (stand-in for a shared store such as Redis)
+    """
+
+    # BEGIN IMMEDIATE can wait up to the connection timeout for another worker's lock
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS login_attempts (key TEXT NOT NULL, attempted_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_key ON login_attempts(key, attempted_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        now = time.time()
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so concurrent workers cannot both pass the count
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM login_attempts WHERE key = ? AND attempted_at <= ?", (key, now - window))
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(attempted_at) FROM login_attempts WHERE key = ?", (key,)
+            ).fetchone()
+            if count >= limit:
+                conn.execute("COMMIT")
+                return False, oldest + window - now
+            conn.execute("INSERT INTO login_attempts (key, attempted_at) VALUES (?, ?)", (key, now))
+            conn.execute("COMMIT")
+            return True, 0.0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reset(self, key: str) -> None:
+        self._conn().execute("DELETE FROM login_attempts WHERE key = ?", (key,))
+
+
+class LoginRateLimiter:
+    """
+    Throttle login attempts per client IP and per username
+    Checked before any password hashing so rejected attempts cost next to nothing
+    """
+
+    def __init__(self, backend, window: float, per_ip: int, per_username: int):
+        self.backend = backend
+        self.window = window
+        self.per_ip = per_ip
+        self.per_username = per_username
+
+    def check(self, ip: str, username: str) -> float:
+        """
+        Record an attempt; returns 0 if it may proceed, otherwise the number of
+        seconds the client should wait (for a Retry-After header)
+        """
+        if self.backend is None:
+            return 0.0
+        allowed, retry_after = self.backend.hit(f"ip:{ip}", self.per_ip, self.window)
+        if not allowed:
+            login_rate_limited.inc("ip")
+            return max(retry_after, 1.0)
+        allowed, retry_after = self.backend.hit(f"user:{username.lower()}", self.per_username, self.window)
+        if not allowed:
+            login_rate_limited.inc("username")
+            return max(retry_after, 1.0)
+        login_attempts.inc()
+        return 0.0
+
+    def succeeded(self, username: str) -> None:
+        """Forget the failed attempts against a username once it logs in"""
+        if self.backend is not None:
+            self.backend.reset(f"user:{username.lower()}")
+
+
+    async def check_async(self, ip: str, username: str) -> float:
+        """check() for async handlers; blocking backends run in a worker thread"""
+        if self.backend is not None and self.backend.blocking:
+            return await to_thread.run_sync(self.check, ip, username)
+        return self.check(ip, username)
+
+    async def succeeded_async(self, username: str) -> None:
+        if self.backend is not None and self.backend.blocking:
+            await to_thread.run_sync(self.succeeded, username)
+        else:
+            self.succeeded(username)
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-real-ip")
+        if forwarded:
+            return forwarded.strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _create_backend():
+    if LOGIN_RATE_LIMIT_BACKEND == "none":
+        return None
+    if LOGIN_RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimitBackend(LOGIN_RATE_LIMIT_PATH)
+    return MemoryRateLimitBackend()
+
+
+login_limiter = LoginRateLimiter(
+    _create_backend(), LOGIN_RATE_LIMIT_WINDOW, LOGIN_RATE_LIMIT_PER_IP, LOGIN_RATE_LIMIT_PER_USERNAME
+)
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+
+import database
+from database import (
+    pool_status, pool_checkout_wait, pool_connections_in_use,
+    pool_checkouts, pool_overflow_checkouts, pool_timeouts
+)
+from cache import response_cache
+from routers.auth import get_current_user_dependency
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/cache")
+def get_cache_stats(current_user: str = Depends(get_current_user_dependency)):
+    """
+    Response cache hit/miss counters (per worker) and entry count
+    """
+    return response_cache.stats()
+
+
+@router.get("/metrics/pool")
+def get_pool_metrics(current_user: str = Depends(get_current_user_dependency)):
+    """
+    Database connection pool state and checkout instrumentation for this worker
+    """
+    pools = {"sync": pool_status(database.engine.pool)}
+    if database.async_engine is not None:
+        pools["async"] = pool_status(database.async_engine.sync_engine.pool)
+
+    wait = pool_checkout_wait.snapshot()
+    in_use = pool_connections_in_use.snapshot()
+    checkouts = pool_checkouts.snapshot()
+    overflow = pool_overflow_checkouts.snapshot()
+    timeouts = pool_timeouts.snapshot()
+    for name, status in pools.items():
+        key = (name,)
+        status.update({
+            "in_use": in_use.get(key, 0),
+            "checkouts": checkouts.get(key, 0),
+            "overflow_checkouts": overflow.get(key, 0),
+            "timeouts": timeouts.get(key, 0),
+            "wait_seconds": wait.get(key, {"buckets": [], "sum": 0.0, "count": 0}),
+        })
+    return pools
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from anyio import CapacityLimiter, to_thread
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from collections import OrderedDict
 from typing import Optional
-import os
+import base64
 import hashlib
+import hmac
+import json
+import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
+from ratelimit import login_limiter, client_ip
+
 # Load .env file if exists
 env_path = Path(__file__).parent.parent / '.env'
 if env_path.exists():
@@ -26,28 +35,46 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Token verification backend: "jose" (python-jose) or "native" (hmac/hashlib HS256 only)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose").lower()
+# Recently verified tokens kept in memory (0 disables the cache)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "256"))
+
+# HMAC key encoded once instead of on every verification
+_SIGNING_KEY = SECRET_KEY.encode("utf-8")
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# For routes that also serve anonymous callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 # Load environment variables
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "")  # Plain text password
+# Precomputed hash from generate_password_hash.py; takes precedence over ADMIN_PASSWORD
+ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH", "") or None
+# Hashes made by generate_password_hash.py before the SHA256 step are plain bcrypt of the password
+_ADMIN_HASH_CONFIGURED = ADMIN_PASSWORD_HASH is not None
+_legacy_hash_warned = False
+
+# Max bcrypt verifications running at once (each takes ~250ms of CPU)
+LOGIN_HASH_CONCURRENCY = int(os.getenv("LOGIN_HASH_CONCURRENCY", "2"))
 
 # Debug: Print if credentials are loaded (only show if not set to avoid exposing password)
-if not ADMIN_USERNAME or not ADMIN_PASSWORD:
+if not ADMIN_USERNAME or not (ADMIN_PASSWORD or ADMIN_PASSWORD_HASH):
     print(f"[AUTH DEBUG] ADMIN_USERNAME: {'SET' if ADMIN_USERNAME else 'NOT SET'}")
     print(f"[AUTH DEBUG] ADMIN_PASSWORD: {'SET' if ADMIN_PASSWORD else 'NOT SET'}")
+    print(f"[AUTH DEBUG] ADMIN_PASSWORD_HASH: {'SET' if ADMIN_PASSWORD_HASH else 'NOT SET'}")
     print(f"[AUTH DEBUG] Checking .env files...")
     print(f"[AUTH DEBUG] Backend .env exists: {env_path.exists()}")
     print(f"[AUTH DEBUG] Root .env exists: {parent_env_path.exists()}")
+if ADMIN_PASSWORD and ADMIN_PASSWORD_HASH:
+    print("[AUTH WARNING] Both ADMIN_PASSWORD and ADMIN_PASSWORD_HASH are set; ADMIN_PASSWORD is ignored")
 
-# Hash the password lazily (on first use) to avoid passlib init errors
-# Bcrypt has a 72 byte limit, so we hash with SHA256 first if password is too long
-ADMIN_PASSWORD_HASH = None
-
+# Bcrypt has a 72 byte limit, so passwords are hashed with SHA256 first
 def _hash_password(password: str) -> str:
     """Hash password, handling long passwords by hashing with SHA256 first"""
     if not password:
@@ -71,21 +98,47 @@ def _hash_password(password: str) -> str:
             raise
 
 def get_password_hash():
-    """Get password hash, initializing if needed (lazy initialization)"""
+    """Get password hash, hashing ADMIN_PASSWORD if no hash was configured or computed yet"""
     global ADMIN_PASSWORD_HASH
     if ADMIN_PASSWORD_HASH is None:
         ADMIN_PASSWORD_HASH = _hash_password(ADMIN_PASSWORD) if ADMIN_PASSWORD else ""
     return ADMIN_PASSWORD_HASH
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
+@router.on_event("startup")
+async def init_password_hash():
+    """Pay the one-off bcrypt hashing of ADMIN_PASSWORD at startup, off the event loop"""
+    await to_thread.run_sync(get_password_hash)
+
+
+# Created on first use: anyio primitives need a running event loop
+_hash_limiter: Optional[CapacityLimiter] = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str, allow_legacy: bool = False) -> bool:
+    """verify_password in a worker thread, at most LOGIN_HASH_CONCURRENCY at a time"""
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = CapacityLimiter(LOGIN_HASH_CONCURRENCY)
+    return await to_thread.run_sync(verify_password, plain_password, hashed_password, allow_legacy, limiter=_hash_limiter)
+
+
+def verify_password(plain_password: str, hashed_password: str, allow_legacy: bool = False) -> bool:
+    """Verify a password against a hash; allow_legacy also accepts plain bcrypt of the password"""
+    global _legacy_hash_warned
     if not plain_password or not hashed_password:
         return False
     try:
         # Always hash with SHA256 first (consistent with _hash_password)
         password_hash = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
-        return pwd_context.verify(password_hash, hashed_password)
+        if pwd_context.verify(password_hash, hashed_password):
+            return True
+        if allow_legacy and pwd_context.verify(plain_password, hashed_password):
+            if not _legacy_hash_warned:
+                _legacy_hash_warned = True
+                print("[AUTH WARNING] ADMIN_PASSWORD_HASH uses the old format; regenerate it with generate_password_hash.py")
+            return True
+        return False
     except Exception as e:
         print(f"[AUTH ERROR] Password verification failed: {str(e)}")
         return False
@@ -103,26 +156,122 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict:
+    """
+    Verify an HS256 token with hmac/hashlib and return its claims
+    Raises JWTError on a malformed, forged or expired token
+    """
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        header = json.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+            raise JWTError("Unexpected token algorithm")
+        expected = hmac.new(_SIGNING_KEY, signing_input.encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            raise JWTError("Signature verification failed")
+        payload = json.loads(_b64url_decode(payload_segment))
+        if not isinstance(payload, dict):
+            raise JWTError("Invalid token claims")
+
+        now = time.time()
+        if "exp" in payload and now >= float(payload["exp"]):
+            raise JWTError("Signature has expired")
+        if "nbf" in payload and now < float(payload["nbf"]):
+            raise JWTError("The token is not yet valid")
+        return payload
+    except (ValueError, TypeError, UnicodeError, OverflowError) as e:
+        raise JWTError(f"Malformed token: {e}")
+
+
+def _decode_token(token: str) -> dict:
+    if JWT_BACKEND == "native":
+        return _decode_hs256(token)
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+class _VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that passed verification: sha256(token) -> (username, exp)
+    Entries are ignored once the token's exp has passed
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[str]:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return username
+
+    def set(self, token: str, username: str, expires_at: Optional[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (username, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_verified_tokens = _VerifiedTokenCache(JWT_CACHE_SIZE)
+
+
 def verify_token(token: str) -> Optional[str]:
     """Verify JWT token and return username"""
+    username = _verified_tokens.get(token)
+    if username is not None:
+        return username
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
         username: str = payload.get("sub")
-        if username is None:
+        if not isinstance(username, str):
             return None
+        exp = payload.get("exp")
+        _verified_tokens.set(token, username, float(exp) if exp is not None else None)
         return username
     except JWTError:
         return None
 
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Login endpoint"""
+    # Throttle before any hashing so a burst of attempts stays cheap
+    retry_after = await login_limiter.check_async(client_ip(request), form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later",
+            headers={"Retry-After": str(int(retry_after + 0.5))},
+        )
+
     # Check if admin credentials are configured
-    if not ADMIN_USERNAME or not ADMIN_PASSWORD:
+    if not ADMIN_USERNAME or not (ADMIN_PASSWORD or ADMIN_PASSWORD_HASH):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Admin credentials not configured. Please set ADMIN_USERNAME and ADMIN_PASSWORD in .env file",
+            detail="Admin credentials not configured. Please set ADMIN_USERNAME and ADMIN_PASSWORD (or ADMIN_PASSWORD_HASH) in .env file",
         )
     
     # Verify credentials
@@ -133,13 +282,17 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(form_data.password, get_password_hash()):
+    # Normally computed at startup; only a login racing the startup hook hashes here
+    password_hash = ADMIN_PASSWORD_HASH or await to_thread.run_sync(get_password_hash)
+    if not await verify_password_async(form_data.password, password_hash, allow_legacy=_ADMIN_HASH_CONFIGURED):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    await login_limiter.succeeded_async(form_data.username)
+
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -166,6 +319,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     return {"username": username}
 
 
+def get_optional_user_dependency(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    """Username of an authenticated caller, or None for anonymous requests and invalid tokens"""
+    return verify_token(token) if token else None
+
+
 def get_current_user_dependency(token: str = Depends(oauth2_scheme)):
     """Dependency to get current user - can be used in other routes"""
     username = verify_token(token)
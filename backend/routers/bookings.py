@@ -1,17 +1,171 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_, func, select, text
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import os
 import uuid
 
 from database import get_db
 from models import Booking
-from schemas import Booking as BookingSchema, BookingCreate, BookingUpdate, PaginatedResponse
-from routers.auth import get_current_user_dependency
+from schemas import Booking as BookingSchema, BookingCreate, BookingUpdate, PaginatedResponse, Availability
+from routers.auth import get_current_user_dependency, get_optional_user_dependency
+from search import contains_pattern
+from pagination import count_rows, page_info
 
 router = APIRouter(prefix="/api/bookings", tags=["bookings"])
 
+# Bookings that hold their time slot (see excl_booking_overlap); inquiries
+# (contact form messages) and canceled bookings never conflict
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+# Longest booking that can be created or made to hold a slot (hours)
+BOOKING_MAX_HOURS = float(os.getenv("BOOKING_MAX_HOURS", "24"))
+
+# Free [start, end) intervals: the requested range minus the union of active bookings
+# overlapping it. && and the status predicate match the exclusion constraint's GiST index
+AVAILABILITY_QUERY = text("""
+    SELECT lower(free) AS start_time, upper(free) AS end_time
+    FROM unnest(
+        tstzmultirange(tstzrange(:start, :end, '[)'))
+        - (
+            SELECT coalesce(range_agg(time_range), '{}'::tstzmultirange)
+            FROM bookings
+            WHERE status IN ('pending', 'confirmed')
+              AND time_range && tstzrange(:start, :end, '[)')
+        )
+    ) AS free
+    WHERE upper(free) - lower(free) >= make_interval(mins => :min_minutes)
+    ORDER BY 1
+""")
+
+
+def overlap_query(start_time: datetime, end_time: datetime, exclude_id: Optional[uuid.UUID] = None):
+    """Whether an active booking (other than exclude_id) overlaps [start_time, end_time)"""
+    query = select(Booking.id).where(
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.time_range.op('&&')(func.tstzrange(start_time, end_time, '[)'))
+    )
+    if exclude_id is not None:
+        query = query.where(Booking.id != exclude_id)
+    return select(query.exists())
+
+
+def has_overlap(db: Session, start_time: datetime, end_time: datetime, exclude_id: Optional[uuid.UUID] = None) -> bool:
+    return db.scalar(overlap_query(start_time, end_time, exclude_id))
+
+
+def slot_taken() -> HTTPException:
+    return HTTPException(status_code=400, detail="Time slot is already booked")
+
+
+def is_slot_conflict(e: IntegrityError) -> bool:
+    """Whether a failed commit was a concurrent booking caught by excl_booking_overlap"""
+    return "excl_booking_overlap" in str(e.orig)
+
+
+def commit_booking(db: Session):
+    """Commit, reporting a concurrent booking caught by excl_booking_overlap as a taken slot"""
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if is_slot_conflict(e):
+            raise slot_taken()
+        raise
+
+
+def check_time_range(start_time: datetime, end_time: datetime, limit_duration: bool = True) -> None:
+    if start_time >= end_time:
+        raise HTTPException(
+            status_code=400,
+            detail="End time must be after start time"
+        )
+    if limit_duration and end_time - start_time > timedelta(hours=BOOKING_MAX_HOURS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bookings can last at most {BOOKING_MAX_HOURS:g} hours"
+        )
+
+
+def check_slot_creator(booking: BookingCreate, current_user: Optional[str]) -> None:
+    """
+    Only the admin may create bookings that hold their slot; anonymous callers
+    (the contact form) can only send inquiries
+    """
+    if booking.status in ACTIVE_STATUSES and current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Log in to create a booking that reserves its time slot",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def updated_slot(db_booking: Booking, update_data: dict):
+    """
+    The [start, end) slot an update makes the booking hold, if it must be checked
+    for overlaps: the time or status changes and the booking (still) holds a slot
+    """
+    if not {'start_time', 'end_time', 'status'} & update_data.keys():
+        return None
+    start_time = update_data.get('start_time', db_booking.start_time)
+    end_time = update_data.get('end_time', db_booking.end_time)
+    holds_slot = update_data.get('status', db_booking.status) in ACTIVE_STATUSES
+    # Bookings that don't hold a slot may keep a legacy range longer than the limit
+    check_time_range(start_time, end_time, limit_duration=holds_slot)
+    return (start_time, end_time) if holds_slot else None
+
+
+BOOKING_SORT_COLUMNS = {
+    "client_name": Booking.client_name,
+    "email": Booking.client_email,
+    "start_time": Booking.start_time,
+    "end_time": Booking.end_time,
+    "status": Booking.status,
+    "created": Booking.created_at,
+}
+
+
+def bookings_filter_query(status: Optional[str], start_date: Optional[datetime], end_date: Optional[datetime], search: Optional[str]):
+    """
+    Filtered booking listing statement, before ordering and paging
+    Shared by the sync and async (routers/bookings_async.py) handlers
+    """
+    query = select(Booking)
+    
+    if status:
+        query = query.where(Booking.status == status)
+    
+    if start_date:
+        query = query.where(Booking.start_time >= start_date)
+    
+    if end_date:
+        query = query.where(Booking.end_time <= end_date)
+    
+    # Handle search (served by the pg_trgm GIN indexes on client_name / client_email)
+    if search:
+        search_term = contains_pattern(search)
+        query = query.where(
+            or_(
+                Booking.client_name.ilike(search_term, escape='\\'),
+                Booking.client_email.ilike(search_term, escape='\\')
+            )
+        )
+    return query
+
+
+def bookings_page_query(query, sort_by: Optional[str], sort_order: Optional[str], skip: int, limit: int):
+    sort_column = BOOKING_SORT_COLUMNS.get(sort_by) if sort_by else None
+    if sort_column is None:
+        # Default sort
+        query = query.order_by(Booking.start_time.asc())
+    elif sort_order == "asc":
+        query = query.order_by(sort_column.asc())
+    else:
+        query = query.order_by(sort_column.desc())
+    return query.offset(skip).limit(limit)
+
 
 @router.get("", response_model=PaginatedResponse[BookingSchema])
 def get_bookings(
@@ -23,74 +177,45 @@ def get_bookings(
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = "asc",
     search: Optional[str] = None,
+    count_mode: str = "exact",
     db: Session = Depends(get_db)
 ):
-    # Base query
-    base_query = db.query(Booking)
-    
-    if status:
-        base_query = base_query.filter(Booking.status == status)
-    
-    if start_date:
-        base_query = base_query.filter(Booking.start_time >= start_date)
-    
-    if end_date:
-        base_query = base_query.filter(Booking.end_time <= end_date)
-    
-    # Handle search
-    if search:
-        from sqlalchemy import or_
-        search_term = f"%{search.lower()}%"
-        base_query = base_query.filter(
-            or_(
-                Booking.client_name.ilike(search_term),
-                Booking.client_email.ilike(search_term)
-            )
-        )
+    """
+    List bookings. count_mode picks how the total is computed: exact (default),
+    estimated (planner statistics), cached (reused briefly per filter) or none
+    """
+    query = bookings_filter_query(status, start_date, end_date, search)
     
     # Get total count
-    total = base_query.count()
-    
-    # Handle sorting
-    if sort_by:
-        sort_column = None
-        if sort_by == "client_name":
-            sort_column = Booking.client_name
-        elif sort_by == "email":
-            sort_column = Booking.client_email
-        elif sort_by == "start_time":
-            sort_column = Booking.start_time
-        elif sort_by == "end_time":
-            sort_column = Booking.end_time
-        elif sort_by == "status":
-            sort_column = Booking.status
-        elif sort_by == "created":
-            sort_column = Booking.created_at
-        
-        if sort_column:
-            if sort_order == "asc":
-                base_query = base_query.order_by(sort_column.asc())
-            else:
-                base_query = base_query.order_by(sort_column.desc())
-        else:
-            # Default sort
-            base_query = base_query.order_by(Booking.start_time.asc())
-    else:
-        # Default sort
-        base_query = base_query.order_by(Booking.start_time.asc())
+    total = count_rows(db, query, count_mode)
     
     # Get paginated bookings
-    bookings = base_query.offset(skip).limit(limit).all()
-    
-    page = (skip // limit) + 1
-    total_pages = (total + limit - 1) // limit if limit > 0 else 1
+    bookings = db.scalars(bookings_page_query(query, sort_by, sort_order, skip, limit)).all()
     
     return {
         'items': bookings,
-        'total': total,
-        'page': page,
-        'page_size': limit,
-        'total_pages': total_pages
+        **page_info(skip, limit, total)
+    }
+
+
+@router.get("/availability", response_model=Availability)
+def get_availability(
+    start: datetime,
+    end: datetime,
+    min_minutes: int = 0,
+    db: Session = Depends(get_db)
+):
+    """
+    Free time slots between start and end, optionally only those lasting at least
+    min_minutes, computed in a single range_agg query
+    """
+    if start >= end:
+        raise HTTPException(status_code=400, detail="End must be after start")
+    rows = db.execute(AVAILABILITY_QUERY, {"start": start, "end": end, "min_minutes": max(min_minutes, 0)}).all()
+    return {
+        "start": start,
+        "end": end,
+        "slots": [{"start_time": row.start_time, "end_time": row.end_time} for row in rows]
     }
 
 
@@ -103,18 +228,17 @@ def get_booking(booking_id: uuid.UUID, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=BookingSchema, status_code=status.HTTP_201_CREATED)
-def create_booking(booking: BookingCreate, db: Session = Depends(get_db)):
+def create_booking(booking: BookingCreate, db: Session = Depends(get_db), current_user: Optional[str] = Depends(get_optional_user_dependency)):
     # Basic validation
-    if booking.start_time >= booking.end_time:
-        raise HTTPException(
-            status_code=400,
-            detail="End time must be after start time"
-        )
+    check_slot_creator(booking, current_user)
+    check_time_range(booking.start_time, booking.end_time)
+    
+    if booking.status in ACTIVE_STATUSES and has_overlap(db, booking.start_time, booking.end_time):
+        raise slot_taken()
     
-    # Create booking (no overlap check for contact form submissions)
     db_booking = Booking(**booking.dict())
     db.add(db_booking)
-    db.commit()
+    commit_booking(db)
     db.refresh(db_booking)
     return db_booking
 
@@ -127,48 +251,15 @@ def update_booking(booking_id: uuid.UUID, booking_update: BookingUpdate, db: Ses
     
     update_data = booking_update.dict(exclude_unset=True)
     
-    # Check for overlapping bookings if time is being updated
-    if 'start_time' in update_data or 'end_time' in update_data:
-        start_time = update_data.get('start_time', db_booking.start_time)
-        end_time = update_data.get('end_time', db_booking.end_time)
-        
-        if start_time >= end_time:
-            raise HTTPException(
-                status_code=400,
-                detail="End time must be after start time"
-            )
-        
-        overlapping = db.query(Booking).filter(
-            and_(
-                Booking.id != booking_id,
-                Booking.status.in_(['pending', 'confirmed']),
-                or_(
-                    and_(
-                        Booking.start_time <= start_time,
-                        Booking.end_time > start_time
-                    ),
-                    and_(
-                        Booking.start_time < end_time,
-                        Booking.end_time >= end_time
-                    ),
-                    and_(
-                        Booking.start_time >= start_time,
-                        Booking.end_time <= end_time
-                    )
-                )
-            )
-        ).first()
-        
-        if overlapping:
-            raise HTTPException(
-                status_code=400,
-                detail="Time slot is already booked"
-            )
+    # Check for overlapping bookings if the booking (still) holds a changed time slot
+    slot = updated_slot(db_booking, update_data)
+    if slot and has_overlap(db, *slot, exclude_id=booking_id):
+        raise slot_taken()
     
     for field, value in update_data.items():
         setattr(db_booking, field, value)
     
-    db.commit()
+    commit_booking(db)
     db.refresh(db_booking)
     return db_booking
 
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from datetime import datetime
+import uuid
+
+from database import get_async_db
+from models import Booking
+from schemas import Booking as BookingSchema, BookingCreate, BookingUpdate, PaginatedResponse, Availability
+from routers.auth import get_current_user_dependency, get_optional_user_dependency
+from routers.bookings import (
+    ACTIVE_STATUSES, AVAILABILITY_QUERY, overlap_query, slot_taken, is_slot_conflict,
+    check_time_range, check_slot_creator, updated_slot, bookings_filter_query, bookings_page_query
+)
+from pagination import count_rows_async, page_info
+
+# Async variant of routers/bookings.py, mounted instead of it when DB_ASYNC is enabled
+router = APIRouter(prefix="/api/bookings", tags=["bookings"])
+
+
+async def commit_booking(db: AsyncSession):
+    """Commit, reporting a concurrent booking caught by excl_booking_overlap as a taken slot"""
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if is_slot_conflict(e):
+            raise slot_taken()
+        raise
+
+
+@router.get("", response_model=PaginatedResponse[BookingSchema])
+async def get_bookings(
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 10,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    count_mode: str = "exact",
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = bookings_filter_query(status, start_date, end_date, search)
+    total = await count_rows_async(db, query, count_mode)
+    bookings = (await db.scalars(bookings_page_query(query, sort_by, sort_order, skip, limit))).all()
+    return {
+        'items': bookings,
+        **page_info(skip, limit, total)
+    }
+
+
+@router.get("/availability", response_model=Availability)
+async def get_availability(
+    start: datetime,
+    end: datetime,
+    min_minutes: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if start >= end:
+        raise HTTPException(status_code=400, detail="End must be after start")
+    rows = (await db.execute(AVAILABILITY_QUERY, {"start": start, "end": end, "min_minutes": max(min_minutes, 0)})).all()
+    return {
+        "start": start,
+        "end": end,
+        "slots": [{"start_time": row.start_time, "end_time": row.end_time} for row in rows]
+    }
+
+
+@router.get("/{booking_id}", response_model=BookingSchema)
+async def get_booking(booking_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await db.get(Booking, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+@router.post("", response_model=BookingSchema, status_code=status.HTTP_201_CREATED)
+async def create_booking(booking: BookingCreate, db: AsyncSession = Depends(get_async_db), current_user: Optional[str] = Depends(get_optional_user_dependency)):
+    check_slot_creator(booking, current_user)
+    check_time_range(booking.start_time, booking.end_time)
+
+    if booking.status in ACTIVE_STATUSES and await db.scalar(overlap_query(booking.start_time, booking.end_time)):
+        raise slot_taken()
+
+    db_booking = Booking(**booking.dict())
+    db.add(db_booking)
+    await commit_booking(db)
+    await db.refresh(db_booking)
+    return db_booking
+
+
+@router.put("/{booking_id}", response_model=BookingSchema)
+async def update_booking(booking_id: uuid.UUID, booking_update: BookingUpdate, db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user_dependency)):
+    db_booking = await db.get(Booking, booking_id)
+    if not db_booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    update_data = booking_update.dict(exclude_unset=True)
+
+    slot = updated_slot(db_booking, update_data)
+    if slot and await db.scalar(overlap_query(*slot, exclude_id=booking_id)):
+        raise slot_taken()
+
+    for field, value in update_data.items():
+        setattr(db_booking, field, value)
+
+    await commit_booking(db)
+    await db.refresh(db_booking)
+    return db_booking
+
+
+@router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_booking(booking_id: uuid.UUID, db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user_dependency)):
+    db_booking = await db.get(Booking, booking_id)
+    if not db_booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    await db.delete(db_booking)
+    await db.commit()
+    return None
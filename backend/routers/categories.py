@@ -1,59 +1,156 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
 import uuid
 
 from database import get_db
-from models import Category
-from schemas import Category as CategorySchema, CategoryCreate
+from models import Category, Post, post_categories, category_post_counts, content_version
+from schemas import Category as CategorySchema, CategoryCreate, CategoryWithCounts
 from routers.auth import get_current_user_dependency
+from serializers import category_to_dict
+from cache import response_cache, CATEGORIES_LIST, invalidate_categories, invalidate_posts
+from etag import make_etag, not_modified, with_validators
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
 
-@router.get("", response_model=List[CategorySchema])
-def get_categories(
-    sort_by: Optional[str] = None,
-    sort_order: Optional[str] = "asc",
-    search: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    query = db.query(Category)
+def upsert_category_counts(category_ids):
+    """Recompute the category_post_counts rows of the given categories (insert or update)"""
+    counts = select(
+        Category.id,
+        func.count(Post.id),
+        func.count(Post.id).filter(Post.status == 'published')
+    ).select_from(Category).outerjoin(
+        post_categories, post_categories.c.category_id == Category.id
+    ).outerjoin(Post, Post.id == post_categories.c.post_id).where(
+        Category.id.in_(category_ids)
+    ).group_by(Category.id)
+    stmt = pg_insert(category_post_counts).from_select(["category_id", "post_count", "published_count"], counts)
+    return stmt.on_conflict_do_update(
+        index_elements=[category_post_counts.c.category_id],
+        set_={"post_count": stmt.excluded.post_count, "published_count": stmt.excluded.published_count}
+    )
+
+
+def refresh_category_counts(db: Session, category_ids):
+    """
+    Bring the counts of the categories a post write touched up to date
+    Call in the same transaction as the write, after flushing it, so a listing's ETag
+    (which covers posts) never pairs with counts from before the write. Cost is
+    proportional to the posts in those categories, not to all posts
+    """
+    category_ids = sorted(set(category_ids))
+    if not category_ids:
+        return
+    # Lock the rows first (in a fixed order) so concurrent writers to the same category
+    # take turns; the recount then runs on a snapshot that includes the earlier commit
+    db.execute(
+        select(category_post_counts.c.category_id)
+        .where(category_post_counts.c.category_id.in_(category_ids))
+        .order_by(category_post_counts.c.category_id)
+        .with_for_update()
+    )
+    db.execute(upsert_category_counts(category_ids))
+
+
+def categories_version_query():
+    """
+    Validator for category listings: the content version, which also moves with
+    post writes (for the post counts)
+    """
+    return select(content_version.c.version).where(content_version.c.id == 1)
+
+
+def categories_query(sort_by: Optional[str], sort_order: Optional[str], search: Optional[str]):
+    """
+    Build the category listing statement: (Category, post_count, published_count) rows
+    Shared by the sync and async (routers/categories_async.py) handlers
+    """
+    post_count = func.coalesce(category_post_counts.c.post_count, 0)
+    query = select(
+        Category,
+        post_count.label("post_count"),
+        func.coalesce(category_post_counts.c.published_count, 0).label("published_count")
+    ).outerjoin(category_post_counts, category_post_counts.c.category_id == Category.id)
     
     # Handle search
     if search:
         search_term = f"%{search.lower()}%"
-        query = query.filter(Category.name.ilike(search_term))
+        query = query.where(Category.name.ilike(search_term))
     
     # Handle sorting
-    if sort_by:
-        sort_column = None
-        if sort_by == "name":
-            sort_column = Category.name
-        elif sort_by == "created":
-            sort_column = Category.created_at
-        
-        if sort_column:
-            if sort_order == "asc":
-                query = query.order_by(sort_column.asc())
-            else:
-                query = query.order_by(sort_column.desc())
+    sort_column = None
+    if sort_by == "name":
+        sort_column = Category.name
+    elif sort_by == "created":
+        sort_column = Category.created_at
+    elif sort_by == "posts":
+        sort_column = post_count
+    
+    if sort_column is not None:
+        if sort_order == "asc":
+            query = query.order_by(sort_column.asc())
         else:
-            # Default sort
-            query = query.order_by(Category.name.asc())
+            query = query.order_by(sort_column.desc())
     else:
         # Default sort
         query = query.order_by(Category.name.asc())
-    
-    categories = query.all()
-    return categories
+    return query
+
+
+def category_row_to_dict(row) -> dict:
+    """Serialize a categories_query row"""
+    return {
+        **category_to_dict(row.Category),
+        'post_count': row.post_count,
+        'published_count': row.published_count
+    }
+
+
+def touch_tagged_posts(category_id: uuid.UUID):
+    """
+    Bump updated_at on posts tagged with category_id, so their HTTP validators
+    change when the category is removed from them
+    """
+    return update(Post).where(
+        Post.id.in_(select(post_categories.c.post_id).where(post_categories.c.category_id == category_id))
+    ).values(updated_at=func.now()).execution_options(synchronize_session=False)
+
+
+@router.get("", response_model=List[CategoryWithCounts])
+def get_categories(
+    request: Request,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    version = db.execute(categories_version_query()).one()
+    etag = make_etag("categories", *version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = response_cache.key(CATEGORIES_LIST, request.query_params, etag)
+    cached = response_cache.lookup(CATEGORIES_LIST, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag)
+
+    rows = db.execute(categories_query(sort_by, sort_order, search)).all()
+    return with_validators(response_cache.store(cache_key, [category_row_to_dict(row) for row in rows]), etag)
 
 
 @router.post("", response_model=CategorySchema, status_code=status.HTTP_201_CREATED)
 def create_category(category: CategoryCreate, db: Session = Depends(get_db), current_user: str = Depends(get_current_user_dependency)):
     db_category = Category(**category.dict())
     db.add(db_category)
+    db.flush()
+    # Start the new category's counts at zero (its row goes with it on delete: ON DELETE CASCADE)
+    db.execute(upsert_category_counts([db_category.id]))
     db.commit()
+    invalidate_categories()
     db.refresh(db_category)
     return db_category
 
@@ -63,7 +160,11 @@ def delete_category(category_id: uuid.UUID, db: Session = Depends(get_db), curre
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
+    db.execute(touch_tagged_posts(category_id))
     db.delete(db_category)
     db.commit()
+    # Posts embed their categories, so cached posts are stale too
+    invalidate_categories()
+    invalidate_posts()
     return None
 
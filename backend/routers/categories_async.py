@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import uuid
+
+from database import get_async_db
+from models import Category
+from schemas import Category as CategorySchema, CategoryCreate, CategoryWithCounts
+from routers.auth import get_current_user_dependency
+from routers.categories import categories_query, categories_version_query, category_row_to_dict, touch_tagged_posts, upsert_category_counts
+from cache import response_cache, CATEGORIES_LIST, invalidate_categories_async, invalidate_posts_async
+from etag import make_etag, not_modified, with_validators
+
+# Async variant of routers/categories.py, mounted instead of it when DB_ASYNC is enabled
+router = APIRouter(prefix="/api/categories", tags=["categories"])
+
+
+@router.get("", response_model=List[CategoryWithCounts])
+async def get_categories(
+    request: Request,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = (await db.execute(categories_version_query())).one()
+    etag = make_etag("categories", *version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = response_cache.key(CATEGORIES_LIST, request.query_params, etag)
+    cached = await response_cache.lookup_async(CATEGORIES_LIST, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag)
+
+    rows = (await db.execute(categories_query(sort_by, sort_order, search))).all()
+    return with_validators(await response_cache.store_async(cache_key, [category_row_to_dict(row) for row in rows]), etag)
+
+
+@router.post("", response_model=CategorySchema, status_code=status.HTTP_201_CREATED)
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user_dependency)):
+    db_category = Category(**category.dict())
+    db.add(db_category)
+    await db.flush()
+    await db.execute(upsert_category_counts([db_category.id]))
+    await db.commit()
+    await invalidate_categories_async()
+    await db.refresh(db_category)
+    return db_category
+
+
+@router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_category(category_id: uuid.UUID, db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user_dependency)):
+    db_category = await db.get(Category, category_id)
+    if not db_category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    await db.execute(touch_tagged_posts(category_id))
+    await db.delete(db_category)
+    await db.commit()
+    # Posts embed their categories, so cached posts are stale too
+    await invalidate_categories_async()
+    await invalidate_posts_async()
+    return None
@@ -1,20 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List
 import uuid
 
 from database import get_db
-from models import Media
+from models import Media, Post
 from schemas import Media as MediaSchema, MediaCreate
+from cache import invalidate_posts
 
 router = APIRouter(prefix="/api/media", tags=["media"])
 
 
+def _touch_post(db: Session, post_id):
+    """Bump the parent post's updated_at so its HTTP validators change"""
+    if post_id:
+        db.query(Post).filter(Post.id == post_id).update({Post.updated_at: func.now()}, synchronize_session=False)
+
+
 @router.post("", response_model=MediaSchema, status_code=status.HTTP_201_CREATED)
 def create_media(media: MediaCreate, db: Session = Depends(get_db)):
     db_media = Media(**media.dict())
     db.add(db_media)
+    _touch_post(db, media.post_id)
     db.commit()
+    invalidate_posts(media.post_id)
     db.refresh(db_media)
     return db_media
 
@@ -27,7 +37,10 @@ def delete_media(media_id: uuid.UUID, db: Session = Depends(get_db)):
     db_media = db.query(Media).filter(Media.id == media_id).first()
     if not db_media:
         raise HTTPException(status_code=404, detail="Media not found")
+    post_id = db_media.post_id
     db.delete(db_media)
+    _touch_post(db, post_id)
     db.commit()
+    invalidate_posts(post_id)
     return None
 
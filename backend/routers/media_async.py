@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, update
+import uuid
+
+from database import get_async_db
+from models import Media, Post
+from schemas import Media as MediaSchema, MediaCreate
+from cache import invalidate_posts_async
+
+# Async variant of routers/media.py, mounted instead of it when DB_ASYNC is enabled
+router = APIRouter(prefix="/api/media", tags=["media"])
+
+
+async def _touch_post(db: AsyncSession, post_id):
+    """Bump the parent post's updated_at so its HTTP validators change"""
+    if post_id:
+        await db.execute(
+            update(Post).where(Post.id == post_id).values(updated_at=func.now()).execution_options(synchronize_session=False)
+        )
+
+
+@router.post("", response_model=MediaSchema, status_code=status.HTTP_201_CREATED)
+async def create_media(media: MediaCreate, db: AsyncSession = Depends(get_async_db)):
+    db_media = Media(**media.dict())
+    db.add(db_media)
+    await _touch_post(db, media.post_id)
+    await db.commit()
+    await invalidate_posts_async(media.post_id)
+    await db.refresh(db_media)
+    return db_media
+
+
+# Note: GET /api/posts/{post_id}/media is served by routers/posts_async.py
+
+
+@router.delete("/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_media(media_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_media = await db.get(Media, media_id)
+    if not db_media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    post_id = db_media.post_id
+    await db.delete(db_media)
+    await _touch_post(db, post_id)
+    await db.commit()
+    await invalidate_posts_async(post_id)
+    return None
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import or_, select, func, insert, update, delete, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
+import re
 import uuid
 
 from database import get_db
 from models import Post, Category, Media
-from models import post_categories  # Import Table separately
+from models import post_categories, content_version  # Import Tables separately
 from schemas import Post as PostSchema, PostCreate, PostUpdate, Media as MediaSchema, PaginatedResponse
-from services.cloudinary_service import delete_media as delete_cloudinary_media
-from services import mux_service
+from schemas import PostBulkOperation, PostBulkResult
+from services.media_cleanup import media_refs
+from services.jobs import enqueue, DELETE_PROVIDER_MEDIA, RESOLVE_MUX_MEDIA
 from routers.auth import get_current_user_dependency
+from routers.categories import refresh_category_counts
+from pagination import encode_cursor, decode_cursor, keyset_filter, page_info, count_rows
+from serializers import post_to_dict, media_to_dict, json_response
+from cache import response_cache, POSTS_LIST, POST_DETAIL, post_detail_key, invalidate_posts, invalidate_categories
+from etag import make_etag, not_modified, with_validators
+from search import contains_pattern
 
 router = APIRouter(prefix="/api/posts", tags=["posts"])
 
@@ -36,214 +46,322 @@ def determine_media_type(media_data) -> str:
     return "image"
 
 
-def post_to_dict(db_post) -> dict:
+def posts_version_query():
     """
-    Convert Post SQLAlchemy object to dict for serialization
-    Avoids Table serialization issues
+    Validator shared by every post listing: the content version, bumped by every
+    committed write to posts, media or categories (models.content_version)
     """
+    return select(content_version.c.version).where(content_version.c.id == 1)
+
+
+def posts_etag(db: Session) -> str:
+    return make_etag("posts", *db.execute(posts_version_query()).one())
+
+
+def media_values(post_id, media_data, idx: int) -> dict:
+    """
+    Column values of a Media row built from upload provider data
+    Mux media without an asset_id keep the direct upload ID as public_id until
+    the resolve_mux_media job swaps in the playback ID
+    """
+    provider = media_data.provider or "cloudinary"
+    metadata = media_data.metadata or {}
+    if media_data.asset_id:
+        metadata = {**metadata, "asset_id": media_data.asset_id}
+    elif provider == "mux":
+        metadata = {**metadata, "upload_id": metadata.get("upload_id") or media_data.public_id}
     return {
-        'id': db_post.id,
-        'title': db_post.title,
-        'description': db_post.description,
-        'status': db_post.status,
-        'created_at': db_post.created_at,
-        'updated_at': db_post.updated_at,
-        'media': [
-            {
-                'id': m.id,
-                'post_id': m.post_id,
-                'type': m.type,
-                'provider': m.provider,
-                'public_id': m.public_id,
-                'url': m.url,
-                'duration': float(m.duration) if m.duration else None,
-                'width': m.width,
-                'height': m.height,
-                'format': m.format,
-                'size': m.size,
-                'meta_data': m.meta_data if isinstance(m.meta_data, dict) else None,
-                'is_featured': m.is_featured if hasattr(m, 'is_featured') else False,
-                'display_order': m.display_order if hasattr(m, 'display_order') else 0,
-                'created_at': m.created_at
-            }
-            for m in sorted(db_post.media, key=lambda x: (not (x.is_featured if hasattr(x, 'is_featured') else False), x.display_order if hasattr(x, 'display_order') else 0))
-        ],
-        'categories': [
-            {
-                'id': c.id,
-                'name': c.name,
-                'created_at': c.created_at
-            }
-            for c in db_post.categories
-        ]
+        "post_id": post_id,
+        "type": determine_media_type(media_data),
+        "provider": provider,
+        "public_id": media_data.public_id,
+        "url": media_data.secure_url,
+        "duration": media_data.duration,
+        "width": media_data.width,
+        "height": media_data.height,
+        "format": media_data.format,
+        "size": media_data.size,
+        "meta_data": metadata,
+        "is_featured": bool(media_data.is_featured),
+        "display_order": media_data.display_order if media_data.display_order is not None else idx,
     }
 
 
-@router.get("", response_model=PaginatedResponse[PostSchema])
-def get_posts(
-    status: Optional[str] = None,
-    category_id: Optional[uuid.UUID] = None,
-    skip: int = 0,
-    limit: int = 12,
-    sort_by: Optional[str] = None,
-    sort_order: Optional[str] = "desc",
-    search: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    # Base query
-    base_query = db.query(Post)
+def reconcile_media(db: Session, post_id, existing: List[Media], media_inputs):
+    """
+    Bring a post's media rows in line with media_inputs without replacing them
+    Items are matched to rows by public_id (or by upload ID for Mux media resolved
+    since the client loaded the post); matched rows keep their id and are only
+    written if a value changed. Changes go out as one bulk UPDATE, INSERT and DELETE at most.
+    Returns (the post's media rows as now stored, whether newly added media need Mux resolution)
+    """
+    by_key = {}
+    for row in existing:
+        by_key.setdefault(row.public_id, row)
+        upload_id = (row.meta_data or {}).get("upload_id")
+        if upload_id:
+            by_key.setdefault(upload_id, row)
+
+    matched = set()
+    updates, inserts = [], []
+    for idx, media_data in enumerate(media_inputs):
+        values = media_values(post_id, media_data, idx)
+        row = by_key.get(media_data.public_id)
+        if row is None or row.id in matched:
+            inserts.append(values)
+            continue
+        matched.add(row.id)
+        row_meta = row.meta_data or {}
+        if row.public_id != media_data.public_id:
+            # Resolved by the worker meanwhile: keep its playback details, apply only layout changes
+            values = {"is_featured": values["is_featured"], "display_order": values["display_order"]}
+        else:
+            # Provider identifiers already on the row win over what the client echoes back
+            ids = {k: row_meta[k] for k in ("upload_id", "asset_id") if k in row_meta}
+            values["meta_data"] = {**row_meta, **values["meta_data"], **ids}
+        changes = {k: v for k, v in values.items() if k != "post_id" and getattr(row, k) != v}
+        if changes:
+            updates.append({"id": row.id, **changes})
+
+    removed = [row for row in existing if row.id not in matched]
+    if removed:
+        # Provider files still referenced by an incoming item are kept (run by worker.py after commit)
+        incoming_ids = {m.public_id for m in media_inputs}
+        orphaned = [row for row in removed if row.public_id not in incoming_ids]
+        if orphaned:
+            enqueue(db, DELETE_PROVIDER_MEDIA, {"refs": media_refs(orphaned)})
+        db.execute(delete(Media).where(Media.id.in_([row.id for row in removed])))
+    if updates:
+        db.execute(update(Media), updates)
+        # Mirror the new values on the loaded rows without marking them dirty
+        rows_by_id = {row.id: row for row in existing}
+        for change in updates:
+            row = rows_by_id[change["id"]]
+            for key, value in change.items():
+                if key != "id":
+                    set_committed_value(row, key, value)
+    inserted = insert_media(db, inserts)
+    kept = [row for row in existing if row.id in matched]
+    return kept + inserted, any(v["provider"] == "mux" and "asset_id" not in v["meta_data"] for v in inserts)
+
+
+def insert_media(db: Session, values: List[dict]) -> List[Media]:
+    """Insert Media rows with a single multi-row INSERT ... RETURNING and return them"""
+    if not values:
+        return []
+    return list(db.execute(insert(Media).returning(Media), values).scalars())
+
+
+def post_category_ids(db: Session, post_ids) -> List[uuid.UUID]:
+    """Categories the given posts are tagged with"""
+    return list(db.scalars(
+        select(post_categories.c.category_id).where(post_categories.c.post_id.in_(post_ids)).distinct()
+    ))
+
+
+def needs_mux_resolution(media_inputs) -> bool:
+    return any(m.provider == "mux" and not m.asset_id for m in media_inputs)
+
+
+def search_tsquery(search: str) -> Optional[str]:
+    """
+    Turn free text into a prefix-matching tsquery ("wed:* & photo:*")
+    Only letters and digits are kept, so user input cannot inject tsquery operators
+    """
+    terms = re.findall(r"[^\W_]+", search.lower())
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+# sort_by value -> (column, cursor key); unknown values fall back to "created"
+POST_SORT_COLUMNS = {
+    "title": (Post.title, "title"),
+    "status": (Post.status, "status"),
+    "created": (Post.created_at, "created"),
+}
+
+
+def posts_filter_query(status: Optional[str], category_id: Optional[uuid.UUID], search: Optional[str], search_mode: str):
+    """
+    Filtered post listing statement (before ordering and paging) and the full-text
+    rank expression when searching. Shared by the sync and async (routers/posts_async.py) handlers
+    """
+    query = select(Post)
     
     if status:
-        base_query = base_query.filter(Post.status == status)
+        query = query.where(Post.status == status)
     
     if category_id:
-        base_query = base_query.join(post_categories).filter(post_categories.c.category_id == category_id)
+        query = query.join(post_categories).where(post_categories.c.category_id == category_id)
     
     # Handle search
-    if search:
-        search_term = f"%{search.lower()}%"
-        base_query = base_query.filter(
+    rank = None
+    # Terms without any word characters (e.g. "!!!" or "_") make no tsquery: match them as substrings
+    tsquery_text = search_tsquery(search) if search and search_mode != "substring" else None
+    if tsquery_text:
+        ts_query = func.to_tsquery('simple', tsquery_text)
+        query = query.where(Post.search_vector.op('@@')(ts_query))
+        rank = func.ts_rank_cd(Post.search_vector, ts_query)
+    elif search:
+        search_term = contains_pattern(search)
+        query = query.where(
             or_(
-                Post.title.ilike(search_term),
-                Post.description.ilike(search_term)
+                Post.title.ilike(search_term, escape='\\'),
+                Post.description.ilike(search_term, escape='\\')
             )
         )
+    return query, rank
+
+
+def posts_page_query(query, rank, sort_by: Optional[str], sort_order: Optional[str], after: Optional[str],
+                     cursor_mode: bool, skip: int, limit: int):
+    """
+    Order and page a posts_filter_query statement
+    Returns (statement, sort column, cursor sort key)
+    """
+    sort_column, sort_key = POST_SORT_COLUMNS.get(sort_by or "created", POST_SORT_COLUMNS["created"])
+    descending = sort_order != "asc"
+    
+    if after:
+        value, last_id = decode_cursor(after, sort_key, is_datetime=sort_key == "created")
+        query = query.where(keyset_filter(sort_column, Post.id, value, last_id, descending))
+    
+    if rank is not None and sort_by is None and not cursor_mode:
+        # Relevance has no stable keyset, so it is only the default in offset mode
+        query = query.order_by(rank.desc(), sort_column.desc(), Post.id.desc())
+    elif descending:
+        query = query.order_by(sort_column.desc(), Post.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Post.id.asc())
     
-    # Get total count
-    total = base_query.count()
-    
-    # Get paginated posts
-    query = base_query.options(
-        joinedload(Post.media),
-        joinedload(Post.categories)
+    # Media and categories are loaded with one batched IN query each
+    # instead of a media x categories join per post
+    query = query.options(
+        selectinload(Post.media),
+        selectinload(Post.categories)
     )
     
-    # Handle sorting
-    if sort_by:
-        sort_column = None
-        if sort_by == "title":
-            sort_column = Post.title
-        elif sort_by == "status":
-            sort_column = Post.status
-        elif sort_by == "created":
-            sort_column = Post.created_at
-        
-        if sort_column:
-            if sort_order == "asc":
-                query = query.order_by(sort_column.asc())
-            else:
-                query = query.order_by(sort_column.desc())
-        else:
-            # Default sort
-            query = query.order_by(Post.created_at.desc())
-    else:
-        # Default sort
-        query = query.order_by(Post.created_at.desc())
-    
-    posts = query.offset(skip).limit(limit).all()
-    
-    # Convert to dict to avoid Table serialization issues
-    result = []
-    for post in posts:
-        post_dict = {
-            'id': post.id,
-            'title': post.title,
-            'description': post.description,
-            'status': post.status,
-            'created_at': post.created_at,
-            'updated_at': post.updated_at,
-        'media': [
-            {
-                'id': m.id,
-                'post_id': m.post_id,
-                'type': m.type,
-                'provider': m.provider,
-                'public_id': m.public_id,
-                'url': m.url,
-                'duration': float(m.duration) if m.duration else None,
-                'width': m.width,
-                'height': m.height,
-                'format': m.format,
-                'size': m.size,
-                'meta_data': m.meta_data if isinstance(m.meta_data, dict) else None,
-                'is_featured': m.is_featured if hasattr(m, 'is_featured') else False,
-                'display_order': m.display_order if hasattr(m, 'display_order') else 0,
-                'created_at': m.created_at
-            }
-            for m in sorted(post.media, key=lambda x: (not (x.is_featured if hasattr(x, 'is_featured') else False), x.display_order if hasattr(x, 'display_order') else 0))
-        ],
-            'categories': [
-                {
-                    'id': c.id,
-                    'name': c.name,
-                    'created_at': c.created_at
-                }
-                for c in post.categories
-            ]
+    if cursor_mode:
+        # Fetch one extra row to know whether another page exists
+        return query.limit(limit + 1), sort_column, sort_key
+    return query.offset(skip).limit(limit), sort_column, sort_key
+
+
+def posts_page(posts: List[Post], total: Optional[int], skip: int, limit: int, cursor_mode: bool, sort_column, sort_key: str) -> dict:
+    """Response body of a post listing page, from the rows of posts_page_query"""
+    if not cursor_mode:
+        return {
+            'items': [post_to_dict(post) for post in posts],
+            **page_info(skip, limit, total)
         }
-        result.append(PostSchema(**post_dict))
-    
-    page = (skip // limit) + 1
-    total_pages = (total + limit - 1) // limit if limit > 0 else 1
     
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        next_cursor = encode_cursor(sort_key, getattr(last, sort_column.key), last.id)
     return {
-        'items': result,
+        'items': [post_to_dict(post) for post in posts],
         'total': total,
-        'page': page,
         'page_size': limit,
-        'total_pages': total_pages
+        'total_pages': (total + limit - 1) // limit if total is not None else None,
+        'next_cursor': next_cursor
     }
 
 
+def post_version_query(post_id: uuid.UUID):
+    # updated_at is bumped by every write that changes the post's representation
+    return select(Post.updated_at).where(Post.id == post_id)
+
+
+def post_detail_query(post_id: uuid.UUID):
+    return select(Post).options(
+        selectinload(Post.media),
+        selectinload(Post.categories)
+    ).where(Post.id == post_id)
+
+
+def post_media_version_query(post_id: uuid.UUID):
+    return select(
+        select(Post.updated_at).where(Post.id == post_id).scalar_subquery(),
+        select(func.count(Media.id)).where(Media.post_id == post_id).scalar_subquery(),
+        select(func.max(Media.created_at)).where(Media.post_id == post_id).scalar_subquery()
+    )
+
+
+@router.get("", response_model=PaginatedResponse[PostSchema])
+def get_posts(
+    request: Request,
+    status: Optional[str] = None,
+    category_id: Optional[uuid.UUID] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(12, ge=1, le=100),
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "desc",
+    search: Optional[str] = None,
+    search_mode: str = "fulltext",
+    pagination: str = "offset",
+    after: Optional[str] = None,
+    include_total: bool = False,
+    count_mode: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List posts. pagination=offset (default) pages with skip/limit and always counts.
+    pagination=cursor (implied by passing `after`) pages by keyset on the active
+    sort column plus id, returns next_cursor and only counts when include_total is set.
+    count_mode (exact, estimated, cached or none) overrides how the total is computed.
+    search_mode=fulltext (default) matches word prefixes against the indexed search_vector
+    and, in offset mode without sort_by, orders by relevance; search_mode=substring
+    keeps the ILIKE match on title and description.
+    """
+    cursor_mode = pagination == "cursor" or after is not None
+
+    etag = posts_etag(db)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = response_cache.key(POSTS_LIST, request.query_params, etag)
+    cached = response_cache.lookup(POSTS_LIST, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag)
+
+    query, rank = posts_filter_query(status, category_id, search, search_mode)
+    
+    # Get total count (optional in cursor mode)
+    if count_mode is None:
+        count_mode = "exact" if not cursor_mode or include_total else "none"
+    total = count_rows(db, query, count_mode)
+    
+    query, sort_column, sort_key = posts_page_query(query, rank, sort_by, sort_order, after, cursor_mode, skip, limit)
+    posts = db.scalars(query).all()
+    
+    response = response_cache.store(cache_key, posts_page(posts, total, skip, limit, cursor_mode, sort_column, sort_key))
+    return with_validators(response, etag)
+
+
 @router.get("/{post_id}", response_model=PostSchema)
-def get_post(post_id: uuid.UUID, db: Session = Depends(get_db)):
-    post = db.query(Post).options(
-        joinedload(Post.media),
-        joinedload(Post.categories)
-    ).filter(Post.id == post_id).first()
+def get_post(post_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    row = db.execute(post_version_query(post_id)).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    updated_at = row.updated_at
+    etag = make_etag("post", post_id, updated_at)
+    unchanged = not_modified(request, etag, updated_at)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = post_detail_key(post_id, etag)
+    cached = response_cache.lookup(POST_DETAIL, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag, updated_at)
+
+    post = db.scalars(post_detail_query(post_id)).first()
     
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Convert to dict to avoid Table serialization issues
-    post_dict = {
-        'id': post.id,
-        'title': post.title,
-        'description': post.description,
-        'status': post.status,
-        'created_at': post.created_at,
-        'updated_at': post.updated_at,
-        'media': [
-            {
-                'id': m.id,
-                'post_id': m.post_id,
-                'type': m.type,
-                'provider': m.provider,
-                'public_id': m.public_id,
-                'url': m.url,
-                'duration': float(m.duration) if m.duration else None,
-                'width': m.width,
-                'height': m.height,
-                'format': m.format,
-                'size': m.size,
-                'meta_data': m.meta_data if isinstance(m.meta_data, dict) else None,
-                'is_featured': m.is_featured if hasattr(m, 'is_featured') else False,
-                'display_order': m.display_order if hasattr(m, 'display_order') else 0,
-                'created_at': m.created_at
-            }
-            for m in sorted(post.media, key=lambda x: (not (x.is_featured if hasattr(x, 'is_featured') else False), x.display_order if hasattr(x, 'display_order') else 0))
-        ],
-        'categories': [
-            {
-                'id': c.id,
-                'name': c.name,
-                'created_at': c.created_at
-            }
-            for c in post.categories
-        ]
-    }
-    
-    return PostSchema(**post_dict)
+    return with_validators(response_cache.store(cache_key, post_to_dict(post)), etag, updated_at)
 
 
 @router.post("", response_model=PostSchema, status_code=status.HTTP_201_CREATED)
@@ -252,199 +370,184 @@ def create_post(post: PostCreate, db: Session = Depends(get_db), current_user: s
     db_post = Post(**post.dict(exclude={'category_ids', 'media'}))
     
     # Add categories (tags)
+    categories = []
     if post.category_ids:
         categories = db.query(Category).filter(Category.id.in_(post.category_ids)).all()
-        db_post.categories = categories
+    db_post.categories = categories
     
     db.add(db_post)
-    db.flush()  # Flush to get post.id
+    db.flush()  # Flush to get post.id (server defaults come back via RETURNING)
+    post_id = db_post.id
     
     # Add media from Cloudinary or Mux (metadata only - files already uploaded)
-    if post.media:
-        for idx, media_data in enumerate(post.media):
-            provider = getattr(media_data, 'provider', "cloudinary")
-            public_id = media_data.public_id
-            url = media_data.secure_url
-            asset_id = getattr(media_data, 'asset_id', None)
-            metadata = getattr(media_data, 'metadata', {}) or {}
-
-            # Resolve Mux details if needed
-            if provider == "mux" and not asset_id:
-                try:
-                    upload_info = mux_service.get_upload_details(public_id)
-                    if upload_info.get("asset_id"):
-                        asset_id = upload_info["asset_id"]
-                        asset_details = mux_service.get_asset_details(asset_id)
-                        if asset_details.get("playback_id"):
-                            public_id = asset_details["playback_id"]
-                            url = mux_service.get_playback_url(public_id)
-                except Exception as e:
-                    print(f"Error resolving Mux asset: {e}")
-
-            db_media = Media(
-                post_id=db_post.id,
-                type=determine_media_type(media_data),
-                provider=provider,
-                public_id=public_id,
-                url=url,
-                duration=media_data.duration,
-                width=media_data.width,
-                height=media_data.height,
-                format=media_data.format,
-                size=media_data.size,
-                meta_data=metadata if not asset_id else {**metadata, "asset_id": asset_id},
-                is_featured=bool(getattr(media_data, 'is_featured', False)),
-                display_order=int(getattr(media_data, 'display_order', idx))
-            )
-            db.add(db_media)
+    media = insert_media(db, [
+        media_values(post_id, media_data, idx) for idx, media_data in enumerate(post.media or [])
+    ])
+    if post.media and needs_mux_resolution(post.media):
+        enqueue(db, RESOLVE_MUX_MEDIA, {"post_id": str(post_id)})
     
-    db.commit()
+    # The response is built from the rows just written instead of reloading the post
+    set_committed_value(db_post, "media", media)
+    body = post_to_dict(db_post)
     
-    # Reload post with relationships
-    db_post = db.query(Post).options(
-        joinedload(Post.media),
-        joinedload(Post.categories)
-    ).filter(Post.id == db_post.id).first()
-    
-    if not db_post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    refresh_category_counts(db, [category.id for category in categories])
+    db.commit()
+    invalidate_posts(post_id)
+    invalidate_categories()
+    return json_response(body, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=PostBulkResult)
+def bulk_update_posts(bulk: PostBulkOperation, db: Session = Depends(get_db), current_user: str = Depends(get_current_user_dependency)):
+    """
+    Apply one operation to many posts in a single transaction
+    Every operation is one set-based statement over the posts that exist; IDs
+    that don't are reported as failed in the per-ID results
+    """
+    post_ids = list(dict.fromkeys(bulk.ids))
+    # Lock the targeted posts so concurrent edits can't interleave with the batch
+    found = set(db.scalars(select(Post.id).where(Post.id.in_(post_ids)).with_for_update()))
+    targets = [post_id for post_id in post_ids if post_id in found]
+    
+    if bulk.operation in ("add_category", "remove_category"):
+        if not db.query(Category.id).filter(Category.id == bulk.category_id).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+    
+    if targets:
+        # Categories whose counts the operation can change (read before a delete removes the tags)
+        if bulk.operation in ("add_category", "remove_category"):
+            affected_categories = [bulk.category_id]
+        else:
+            affected_categories = post_category_ids(db, targets)
+        
+        if bulk.operation in ("publish", "unpublish"):
+            db.execute(
+                update(Post)
+                .where(Post.id.in_(targets))
+                .values(status='published' if bulk.operation == "publish" else 'draft', updated_at=func.now())
+            )
+        elif bulk.operation == "add_category":
+            db.execute(
+                pg_insert(post_categories)
+                .from_select(
+                    ["post_id", "category_id"],
+                    select(Post.id, literal(bulk.category_id, type_=Category.id.type)).where(Post.id.in_(targets))
+                )
+                .on_conflict_do_nothing()
+            )
+        elif bulk.operation == "remove_category":
+            db.execute(
+                delete(post_categories)
+                .where(post_categories.c.post_id.in_(targets), post_categories.c.category_id == bulk.category_id)
+            )
+        elif bulk.operation == "delete":
+            # One cleanup job for all provider files (run by worker.py after commit)
+            removed_media = db.query(Media).filter(Media.post_id.in_(targets)).all()
+            if removed_media:
+                enqueue(db, DELETE_PROVIDER_MEDIA, {"refs": media_refs(removed_media)})
+            # media and post_categories rows go with the posts (ON DELETE CASCADE)
+            db.execute(delete(Post).where(Post.id.in_(targets)).execution_options(synchronize_session=False))
+        
+        if bulk.operation in ("add_category", "remove_category"):
+            # Category changes don't touch the posts rows; bump their HTTP validator
+            db.execute(update(Post).where(Post.id.in_(targets)).values(updated_at=func.now()))
+        
+        refresh_category_counts(db, affected_categories)
     
-    return PostSchema(**post_to_dict(db_post))
+    db.commit()
+    if targets:
+        invalidate_posts()
+        invalidate_categories()
+    
+    results = [
+        {"id": post_id, "success": post_id in found, **({} if post_id in found else {"error": "Post not found"})}
+        for post_id in post_ids
+    ]
+    return {
+        "operation": bulk.operation,
+        "succeeded": len(targets),
+        "failed": len(post_ids) - len(targets),
+        "results": results
+    }
 
 
 @router.put("/{post_id}", response_model=PostSchema)
 def update_post(post_id: uuid.UUID, post_update: PostUpdate, db: Session = Depends(get_db), current_user: str = Depends(get_current_user_dependency)):
     db_post = db.query(Post).options(
-        joinedload(Post.media)
+        selectinload(Post.media),
+        selectinload(Post.categories)
     ).filter(Post.id == post_id).first()
     
     if not db_post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     
-    # Store old media before update
-    old_media = list(db_post.media) if db_post.media else []
-    
     update_data = post_update.dict(exclude_unset=True, exclude={'category_ids', 'media'})
     for field, value in update_data.items():
         setattr(db_post, field, value)
+    # Bump explicitly: category/media-only changes don't dirty the posts row,
+    # and updated_at is the post's HTTP validator
+    db_post.updated_at = func.now()
     
+    # Counts change for the categories the post leaves as well as those it joins
+    affected_categories = {category.id for category in db_post.categories}
     if post_update.category_ids is not None:
         categories = db.query(Category).filter(Category.id.in_(post_update.category_ids)).all()
         db_post.categories = categories
     
-    # Handle media update
+    # Handle media update: only changed, added and removed items are written
     if post_update.media is not None:
-        # Get public_ids of new media
-        new_public_ids = {m.public_id for m in post_update.media if m.public_id}
-        
-        # Delete old media from providers that are not in new list
-        for old_media_item in old_media:
-            # Only delete if not in new media list
-            if old_media_item.public_id not in new_public_ids:
-                try:
-                    if old_media_item.provider == "cloudinary" and old_media_item.public_id:
-                        resource_type = "video" if old_media_item.type == "video" else "image"
-                        delete_result = delete_cloudinary_media(old_media_item.public_id, resource_type=resource_type)
-                        if not delete_result.get("success"):
-                            print(f"Warning: Failed to delete old Cloudinary media {old_media_item.public_id}: {delete_result.get('error', delete_result.get('message'))}")
-                    elif old_media_item.provider == "mux":
-                        asset_id = old_media_item.meta_data.get("asset_id") if old_media_item.meta_data else None
-                        if asset_id:
-                            mux_service.delete_asset(asset_id)
-                except Exception as e:
-                    print(f"Warning: Error deleting old media {old_media_item.public_id}: {str(e)}")
-        
-        # Remove all old media from database
-        for old_media_item in old_media:
-            db.delete(old_media_item)
-        
-        # Add new media (metadata only - files already uploaded)
-        for idx, media_data in enumerate(post_update.media):
-            provider = getattr(media_data, 'provider', "cloudinary")
-            public_id = media_data.public_id
-            url = media_data.secure_url
-            asset_id = getattr(media_data, 'asset_id', None)
-            metadata = getattr(media_data, 'metadata', {}) or {}
-
-            # Resolve Mux details if needed
-            if provider == "mux" and not asset_id:
-                try:
-                    upload_info = mux_service.get_upload_details(public_id)
-                    if upload_info.get("asset_id"):
-                        asset_id = upload_info["asset_id"]
-                        asset_details = mux_service.get_asset_details(asset_id)
-                        if asset_details.get("playback_id"):
-                            public_id = asset_details["playback_id"]
-                            url = mux_service.get_playback_url(public_id)
-                except Exception as e:
-                    print(f"Error resolving Mux asset: {e}")
-
-            db_media = Media(
-                post_id=db_post.id,
-                type=determine_media_type(media_data),
-                provider=provider,
-                public_id=public_id,
-                url=url,
-                duration=media_data.duration,
-                width=media_data.width,
-                height=media_data.height,
-                format=media_data.format,
-                size=media_data.size,
-                meta_data=metadata if not asset_id else {**metadata, "asset_id": asset_id},
-                is_featured=bool(getattr(media_data, 'is_featured', False)),
-                display_order=int(getattr(media_data, 'display_order', idx))
-            )
-            db.add(db_media)
-    
+        media, needs_resolution = reconcile_media(db, db_post.id, list(db_post.media), post_update.media)
+        set_committed_value(db_post, "media", media)
+        if needs_resolution:
+            enqueue(db, RESOLVE_MUX_MEDIA, {"post_id": str(post_id)})
+    
+    # The response is built from the rows in the session instead of reloading the post
+    db.flush()
+    body = post_to_dict(db_post)
+    
+    counts_changed = 'status' in update_data or post_update.category_ids is not None
+    if counts_changed:
+        affected_categories.update(category.id for category in db_post.categories)
+        refresh_category_counts(db, affected_categories)
     db.commit()
-    
-    # Reload post with relationships
-    db_post = db.query(Post).options(
-        joinedload(Post.media),
-        joinedload(Post.categories)
-    ).filter(Post.id == db_post.id).first()
-    
-    if not db_post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    
-    return PostSchema(**post_to_dict(db_post))
+    invalidate_posts(post_id)
+    if counts_changed:
+        invalidate_categories()
+    return json_response(body)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_post(post_id: uuid.UUID, db: Session = Depends(get_db), current_user: str = Depends(get_current_user_dependency)):
     db_post = db.query(Post).options(
-        joinedload(Post.media)
+        selectinload(Post.media)
     ).filter(Post.id == post_id).first()
     
     if not db_post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     
-    # Delete media from Cloudinary before deleting post
+    # Delete media from Cloudinary / Mux (run by worker.py after commit)
     if db_post.media:
-        for media in db_post.media:
-            # Only delete if provider is cloudinary and public_id exists
-            # Delete based on provider
-            try:
-                if media.provider == "cloudinary" and media.public_id:
-                    resource_type = "video" if media.type == "video" else "image"
-                    delete_result = delete_cloudinary_media(media.public_id, resource_type=resource_type)
-                    if not delete_result.get("success"):
-                        print(f"Warning: Failed to delete media {media.public_id} from Cloudinary: {delete_result.get('error', delete_result.get('message'))}")
-                elif media.provider == "mux":
-                    asset_id = media.meta_data.get("asset_id") if media.meta_data else None
-                    if asset_id:
-                        mux_service.delete_asset(asset_id)
-            except Exception as e:
-                print(f"Warning: Error deleting media {media.public_id}: {str(e)}")
+        enqueue(db, DELETE_PROVIDER_MEDIA, {"refs": media_refs(db_post.media)})
     
+    category_ids = post_category_ids(db, [post_id])
     # Delete post (cascade will delete media records in DB)
     db.delete(db_post)
+    db.flush()
+    refresh_category_counts(db, category_ids)
     db.commit()
+    invalidate_posts(post_id)
+    invalidate_categories()
     return None
 
 
 @router.get("/{post_id}/media", response_model=List[MediaSchema])
-def get_post_media(post_id: uuid.UUID, db: Session = Depends(get_db)):
-    media = db.query(Media).filter(Media.post_id == post_id).all()
-    return media
+def get_post_media(post_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    version = db.execute(post_media_version_query(post_id)).one()
+    etag = make_etag("post_media", post_id, *version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    media = db.scalars(select(Media).where(Media.post_id == post_id)).all()
+    return with_validators(json_response([media_to_dict(m) for m in media]), etag)
 
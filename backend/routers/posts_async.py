@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+import uuid
+
+from database import get_async_db
+from models import Media
+from schemas import Post as PostSchema, Media as MediaSchema, PaginatedResponse
+from routers import posts
+from routers.posts import (
+    posts_version_query, posts_filter_query, posts_page_query, posts_page,
+    post_version_query, post_detail_query, post_media_version_query
+)
+from pagination import count_rows_async
+from serializers import post_to_dict, media_to_dict, json_response
+from cache import response_cache, POSTS_LIST, POST_DETAIL, post_detail_key
+from etag import make_etag, not_modified, with_validators
+
+# Async variant of the read handlers of routers/posts.py, mounted instead of it when
+# DB_ASYNC is enabled. Writes stay on the sync handlers, which are reused as they are
+router = APIRouter(prefix="/api/posts", tags=["posts"])
+
+
+@router.get("", response_model=PaginatedResponse[PostSchema])
+async def get_posts(
+    request: Request,
+    status: Optional[str] = None,
+    category_id: Optional[uuid.UUID] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(12, ge=1, le=100),
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "desc",
+    search: Optional[str] = None,
+    search_mode: str = "fulltext",
+    pagination: str = "offset",
+    after: Optional[str] = None,
+    include_total: bool = False,
+    count_mode: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List posts (see routers/posts.py get_posts for the parameters)"""
+    cursor_mode = pagination == "cursor" or after is not None
+
+    etag = make_etag("posts", *(await db.execute(posts_version_query())).one())
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = response_cache.key(POSTS_LIST, request.query_params, etag)
+    cached = await response_cache.lookup_async(POSTS_LIST, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag)
+
+    query, rank = posts_filter_query(status, category_id, search, search_mode)
+
+    if count_mode is None:
+        count_mode = "exact" if not cursor_mode or include_total else "none"
+    total = await count_rows_async(db, query, count_mode)
+
+    query, sort_column, sort_key = posts_page_query(query, rank, sort_by, sort_order, after, cursor_mode, skip, limit)
+    result = (await db.scalars(query)).all()
+
+    response = await response_cache.store_async(cache_key, posts_page(result, total, skip, limit, cursor_mode, sort_column, sort_key))
+    return with_validators(response, etag)
+
+
+@router.get("/{post_id}", response_model=PostSchema)
+async def get_post(post_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(post_version_query(post_id))).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    updated_at = row.updated_at
+    etag = make_etag("post", post_id, updated_at)
+    unchanged = not_modified(request, etag, updated_at)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = post_detail_key(post_id, etag)
+    cached = await response_cache.lookup_async(POST_DETAIL, cache_key)
+    if cached is not None:
+        return with_validators(cached, etag, updated_at)
+
+    post = (await db.scalars(post_detail_query(post_id))).first()
+
+    if not post:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+    return with_validators(await response_cache.store_async(cache_key, post_to_dict(post)), etag, updated_at)
+
+
+@router.get("/{post_id}/media", response_model=List[MediaSchema])
+async def get_post_media(post_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    version = (await db.execute(post_media_version_query(post_id))).one()
+    etag = make_etag("post_media", post_id, *version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    media = (await db.scalars(select(Media).where(Media.post_id == post_id))).all()
+    return with_validators(json_response([media_to_dict(m) for m in media]), etag)
+
+
+# Create, bulk, update and delete: the sync handlers of routers/posts.py
+router.routes.extend(route for route in posts.router.routes if "GET" not in route.methods)
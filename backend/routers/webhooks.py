@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from database import get_db
+from models import Media, Post
+from services import mux_service
+from cache import invalidate_posts
+
+# Signing secret of the webhook configured in the Mux dashboard
+MUX_WEBHOOK_SECRET = os.getenv("MUX_WEBHOOK_SECRET", "")
+# Reject signatures older than this many seconds (replay protection)
+MUX_WEBHOOK_TOLERANCE = int(os.getenv("MUX_WEBHOOK_TOLERANCE", "300"))
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+
+def verify_mux_signature(body: bytes, header: str, secret: str, tolerance: int = MUX_WEBHOOK_TOLERANCE) -> bool:
+    """
+    Check a Mux-Signature header ("t=<timestamp>,v1=<hex hmac>")
+    The signature is HMAC-SHA256 of "<timestamp>.<raw body>" with the webhook secret
+    """
+    parts = {}
+    for item in header.split(","):
+        key, _, value = item.strip().partition("=")
+        parts.setdefault(key, []).append(value)
+
+    timestamp = (parts.get("t") or [""])[0]
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > tolerance:
+        return False
+
+    expected = hmac.new(secret.encode("utf-8"), timestamp.encode("utf-8") + b"." + body, hashlib.sha256).hexdigest()
+    return any(hmac.compare_digest(expected, signature) for signature in parts.get("v1", []))
+
+
+def _apply_asset_ready(db: Session, asset: dict) -> int:
+    """Fill in playback details on the Media rows created from this asset. Returns rows updated"""
+    asset_id = asset.get("id")
+    upload_id = asset.get("upload_id")
+    playback_ids = asset.get("playback_ids") or []
+    if not asset_id or not playback_ids:
+        return 0
+    playback_id = playback_ids[0]["id"]
+
+    # Unresolved rows still carry the upload ID, either in metadata or as public_id
+    match = [Media.meta_data["asset_id"].astext == asset_id]
+    if upload_id:
+        match += [Media.meta_data["upload_id"].astext == upload_id, Media.public_id == upload_id]
+    rows = db.query(Media).filter(Media.provider == "mux", or_(*match)).all()
+
+    post_ids = set()
+    for media in rows:
+        media.public_id = playback_id
+        media.url = mux_service.get_playback_url(playback_id)
+        if asset.get("duration") and not media.duration:
+            media.duration = asset["duration"]
+        media.meta_data = {
+            **(media.meta_data or {}),
+            **({"upload_id": upload_id} if upload_id else {}),
+            "asset_id": asset_id,
+            "aspect_ratio": asset.get("aspect_ratio"),
+            "max_stored_resolution": asset.get("max_stored_resolution"),
+        }
+        if media.post_id:
+            post_ids.add(media.post_id)
+
+    if post_ids:
+        db.query(Post).filter(Post.id.in_(post_ids)).update({Post.updated_at: func.now()}, synchronize_session=False)
+    db.commit()
+    for post_id in post_ids:
+        invalidate_posts(post_id)
+    return len(rows)
+
+
+@router.post("/mux")
+async def mux_webhook(request: Request, db: Session = Depends(get_db)):
+    """
+    Receive Mux webhook events
+    video.asset.ready updates the matching Media rows with the asset's playback ID and duration;
+    other event types are acknowledged and ignored
+    """
+    if not MUX_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Mux webhook secret not configured")
+
+    body = await request.body()
+    if not verify_mux_signature(body, request.headers.get("mux-signature", ""), MUX_WEBHOOK_SECRET):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook signature")
+
+    try:
+        event = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON payload")
+
+    if event.get("type") != "video.asset.ready":
+        return {"received": True}
+
+    # The session is synchronous; keep its queries off the event loop
+    updated = await run_in_threadpool(_apply_asset_ready, db, event.get("data") or {})
+    return {"received": True, "updated": updated}
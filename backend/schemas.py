@@ -8,10 +8,11 @@ T = TypeVar('T')
 # Pagination Response Schema
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
-    page: int
+    total: Optional[int] = None  # None when the count was skipped (cursor mode)
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Opaque token for the next page in cursor mode
 
 # Media Schemas
 class MediaBase(BaseModel):
@@ -78,6 +79,10 @@ class Category(CategoryBase):
     class Config:
         from_attributes = True
 
+class CategoryWithCounts(Category):
+    post_count: int = 0
+    published_count: int = 0
+
 # Post Schemas
 class PostBase(BaseModel):
     title: str
@@ -151,6 +156,33 @@ class Post(PostBase):
     class Config:
         from_attributes = True
 
+# Bulk admin operations on posts
+POST_BULK_OPERATIONS = ("publish", "unpublish", "add_category", "remove_category", "delete")
+
+class PostBulkOperation(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    operation: str  # One of POST_BULK_OPERATIONS
+    category_id: Optional[UUID] = None  # Required by add_category / remove_category
+
+    @model_validator(mode='after')
+    def validate_operation(self):
+        if self.operation not in POST_BULK_OPERATIONS:
+            raise ValueError(f"operation must be one of: {', '.join(POST_BULK_OPERATIONS)}")
+        if self.operation in ("add_category", "remove_category") and self.category_id is None:
+            raise ValueError(f"category_id is required for {self.operation}")
+        return self
+
+class PostBulkItemResult(BaseModel):
+    id: UUID
+    success: bool
+    error: Optional[str] = None
+
+class PostBulkResult(BaseModel):
+    operation: str
+    succeeded: int
+    failed: int
+    results: List[PostBulkItemResult]
+
 # Booking Schemas
 class BookingBase(BaseModel):
     client_name: str
@@ -159,8 +191,20 @@ class BookingBase(BaseModel):
     end_time: datetime
     message: Optional[str] = None
 
+# Statuses a booking can be created with: contact form messages are inquiries and
+# never hold a time slot; pending bookings do (see routers/bookings.py ACTIVE_STATUSES)
+# and can only be created by the admin
+BOOKING_CREATE_STATUSES = ("inquiry", "pending")
+
 class BookingCreate(BookingBase):
-    pass
+    status: str = 'inquiry'
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, value):
+        if value not in BOOKING_CREATE_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(BOOKING_CREATE_STATUSES)}")
+        return value
 
 class BookingUpdate(BaseModel):
     client_name: Optional[str] = None
@@ -179,3 +223,12 @@ class Booking(BookingBase):
     class Config:
         from_attributes = True
 
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class Availability(BaseModel):
+    start: datetime
+    end: datetime
+    slots: List[AvailabilitySlot]
+
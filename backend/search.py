@@ -0,0 +1,8 @@
+def escape_like(value: str, escape: str = "\\") -> str:
+    """Escape LIKE/ILIKE wildcards so user input is matched literally"""
+    return value.replace(escape, escape * 2).replace("%", escape + "%").replace("_", escape + "_")
+
+
+def contains_pattern(value: str) -> str:
+    """ILIKE pattern matching value anywhere in the column (use with escape='\\\\')"""
+    return f"%{escape_like(value)}%"
@@ -0,0 +1,87 @@
+from fastapi.responses import Response
+
+# orjson is optional; fall back to the stdlib encoder if it isn't installed
+try:
+    import orjson
+
+    def dumps(content) -> bytes:
+        return orjson.dumps(content)
+except ImportError:
+    import json
+
+    def dumps(content) -> bytes:
+        return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def media_sort_key(m):
+    """Featured media first, then by display_order"""
+    return (not m.is_featured, m.display_order or 0)
+
+
+def media_to_dict(m) -> dict:
+    """
+    Convert Media SQLAlchemy object to a JSON-ready dict
+    Keys match the Media response schema (meta_data is exposed as "metadata")
+    """
+    return {
+        'id': str(m.id),
+        'post_id': _str(m.post_id),
+        'type': m.type,
+        'provider': m.provider,
+        'public_id': m.public_id,
+        'url': m.url,
+        'duration': float(m.duration) if m.duration else None,
+        'width': m.width,
+        'height': m.height,
+        'format': m.format,
+        'size': m.size,
+        'metadata': m.meta_data if isinstance(m.meta_data, dict) else None,
+        'is_featured': bool(m.is_featured),
+        'display_order': m.display_order or 0,
+        'created_at': _isoformat(m.created_at)
+    }
+
+
+def category_to_dict(c) -> dict:
+    """
+    Convert Category SQLAlchemy object to a JSON-ready dict
+    """
+    return {
+        'id': str(c.id),
+        'name': c.name,
+        'created_at': _isoformat(c.created_at)
+    }
+
+
+def post_to_dict(db_post) -> dict:
+    """
+    Convert Post SQLAlchemy object to a JSON-ready dict
+    This is the only Post serialization path: the result is written straight
+    to the response, so it is not validated a second time by PostSchema
+    """
+    return {
+        'id': str(db_post.id),
+        'title': db_post.title,
+        'description': db_post.description,
+        'status': db_post.status,
+        'created_at': _isoformat(db_post.created_at),
+        'updated_at': _isoformat(db_post.updated_at),
+        'media': [media_to_dict(m) for m in sorted(db_post.media, key=media_sort_key)],
+        'categories': [category_to_dict(c) for c in db_post.categories]
+    }
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    """
+    Encode already-serialized content directly into a JSON response,
+    bypassing response_model validation
+    """
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
@@ -1,11 +1,18 @@
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.api_client.call_api
+import cloudinary.utils
+from cloudinary.exceptions import NotFound, NotAllowed, BadRequest, AuthorizationRequired, AlreadyExists
 from typing import Optional, Dict, List
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
+from metrics import provider_call
+
 # Load .env file if exists
 env_path = Path(__file__).parent.parent / '.env'
 if env_path.exists():
@@ -16,36 +23,114 @@ parent_env_path = Path(__file__).parent.parent.parent / '.env'
 if parent_env_path.exists():
     load_dotenv(parent_env_path)
 
-# Initialize Cloudinary function (called when needed)
-def init_cloudinary():
-    """Initialize Cloudinary configuration - reads env vars fresh each time"""
-    # Reload env vars each time to ensure latest values
-    cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME", "")
-    api_key = os.getenv("CLOUDINARY_API_KEY", "")
-    api_secret = os.getenv("CLOUDINARY_API_SECRET", "")
-    
-    if not cloud_name or not api_key or not api_secret:
+class CloudinarySettings:
+    """Cloudinary credentials and client tuning, read from the environment once"""
+
+    def __init__(self):
+        self.cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME", "")
+        self.api_key = os.getenv("CLOUDINARY_API_KEY", "")
+        self.api_secret = os.getenv("CLOUDINARY_API_SECRET", "")
+        self.upload_preset = os.getenv("CLOUDINARY_UPLOAD_PRESET", "")
+        self.timeout = float(os.getenv("CLOUDINARY_TIMEOUT", "30"))  # seconds per API call (deletes)
+        self.max_retries = int(os.getenv("CLOUDINARY_MAX_RETRIES", "2"))  # retries for transient delete failures
+        # Video uploads can take minutes; unset means no client-side timeout
+        upload_timeout = os.getenv("CLOUDINARY_UPLOAD_TIMEOUT", "")
+        self.upload_timeout = float(upload_timeout) if upload_timeout else None
+        self.pool_size = int(os.getenv("CLOUDINARY_POOL_SIZE", "10"))  # keep-alive connections kept per host
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.cloud_name and self.api_key and self.api_secret)
+
+
+_settings: Optional[CloudinarySettings] = None
+_settings_lock = threading.Lock()
+
+
+def reload_cloudinary_config() -> CloudinarySettings:
+    """
+    Re-read the environment and reconfigure the SDK
+    Also rebuilds the SDK's shared HTTP connection pools with CLOUDINARY_POOL_SIZE
+    connections, so concurrent cleanup calls reuse keep-alive connections
+    """
+    global _settings
+    with _settings_lock:
+        settings = CloudinarySettings()
+        if settings.is_configured:
+            cloudinary.config(
+                cloud_name=settings.cloud_name,
+                api_key=settings.api_key,
+                api_secret=settings.api_secret
+            )
+        http = cloudinary.utils.get_http_connector(
+            cloudinary.config(), {**cloudinary.CERT_KWARGS, "maxsize": settings.pool_size}
+        )
+        # Private module attributes of the pinned cloudinary==1.36.0 (requirements.txt);
+        # check they still exist when upgrading the SDK
+        cloudinary.uploader._http = http
+        cloudinary.api_client.call_api._http = http
+        _settings = settings
+        return settings
+
+
+def init_cloudinary() -> CloudinarySettings:
+    """
+    Return the Cloudinary settings, configuring the SDK on first use
+    Until credentials are found, every call re-reads the environment
+    """
+    settings = _settings
+    if settings is None or not settings.is_configured:
+        settings = reload_cloudinary_config()
+    if not settings.is_configured:
         raise ValueError(
             f"Cloudinary configuration missing. "
-            f"CLOUD_NAME: {'SET' if cloud_name else 'NOT SET'}, "
-            f"API_KEY: {'SET' if api_key else 'NOT SET'}, "
-            f"API_SECRET: {'SET' if api_secret else 'NOT SET'}"
+            f"CLOUD_NAME: {'SET' if settings.cloud_name else 'NOT SET'}, "
+            f"API_KEY: {'SET' if settings.api_key else 'NOT SET'}, "
+            f"API_SECRET: {'SET' if settings.api_secret else 'NOT SET'}"
         )
-    
-    cloudinary.config(
-        cloud_name=cloud_name,
-        api_key=api_key,
-        api_secret=api_secret
-    )
+    return settings
+
 
 # Initialize on import
 try:
     init_cloudinary()
 except ValueError:
-    # Will be initialized when actually needed
+    # Not configured yet: the next init_cloudinary() call checks the environment again
     pass
 
 
+def _call_with_retries(settings: CloudinarySettings, operation: str, func, *args, **kwargs):
+    """
+    Call a Cloudinary SDK function with the configured timeout, retrying
+    transient failures (rate limits, 5xx, network errors) with exponential backoff
+    Only for idempotent calls (deletes); see _upload
+    """
+    attempt = 0
+    while True:
+        try:
+            with provider_call("cloudinary", operation):
+                return func(*args, timeout=settings.timeout, **kwargs)
+        except (NotFound, NotAllowed, BadRequest, AuthorizationRequired, AlreadyExists):
+            raise
+        except Exception:
+            if attempt >= settings.max_retries:
+                raise
+            time.sleep(0.5 * (2 ** attempt))
+            attempt += 1
+
+
+def _upload(settings: CloudinarySettings, source: str, **options) -> Dict:
+    """
+    Upload once, with CLOUDINARY_UPLOAD_TIMEOUT if set
+    Uploads are not retried: an attempt that timed out may still have created the
+    asset, and a retry would store it twice
+    """
+    if settings.upload_timeout is not None:
+        options["timeout"] = settings.upload_timeout
+    with provider_call("cloudinary", "upload"):
+        return cloudinary.uploader.upload(source, **options)
+
+
 def upload_video(file_path: str, folder: Optional[str] = None, resource_type: str = "video") -> Dict:
     """
     Upload video to Cloudinary
@@ -65,10 +150,8 @@ def upload_video(file_path: str, folder: Optional[str] = None, resource_type: st
         - format
         - bytes (size)
     """
-    # Re-initialize to ensure latest env vars are used
-    init_cloudinary()
-    
-    upload_preset = os.getenv("CLOUDINARY_UPLOAD_PRESET", "")
+    settings = init_cloudinary()
+    upload_preset = settings.upload_preset
     
     upload_options = {
         "resource_type": resource_type,
@@ -80,10 +163,7 @@ def upload_video(file_path: str, folder: Optional[str] = None, resource_type: st
     if upload_preset:
         upload_options["upload_preset"] = upload_preset
     
-    result = cloudinary.uploader.upload(
-        file_path,
-        **upload_options
-    )
+    result = _upload(settings, file_path, **upload_options)
     
     return {
         "public_id": result.get("public_id"),
@@ -108,10 +188,8 @@ def upload_video_from_url(video_url: str, folder: Optional[str] = None) -> Dict:
     Returns:
         Dict with upload result
     """
-    # Re-initialize to ensure latest env vars are used
-    init_cloudinary()
-    
-    upload_preset = os.getenv("CLOUDINARY_UPLOAD_PRESET", "")
+    settings = init_cloudinary()
+    upload_preset = settings.upload_preset
     
     upload_options = {
         "resource_type": "video",
@@ -123,10 +201,7 @@ def upload_video_from_url(video_url: str, folder: Optional[str] = None) -> Dict:
     if upload_preset:
         upload_options["upload_preset"] = upload_preset
     
-    result = cloudinary.uploader.upload(
-        video_url,
-        **upload_options
-    )
+    result = _upload(settings, video_url, **upload_options)
     
     return {
         "public_id": result.get("public_id"),
@@ -151,13 +226,11 @@ def delete_media(public_id: str, resource_type: str = "video") -> Dict:
     Returns:
         Dict with deletion result
     """
-    # Re-initialize to ensure latest env vars are used
-    init_cloudinary()
+    settings = init_cloudinary()
     
     try:
-        result = cloudinary.uploader.destroy(
-            public_id,
-            resource_type=resource_type
+        result = _call_with_retries(
+            settings, "destroy", cloudinary.uploader.destroy, public_id, resource_type=resource_type
         )
         return {
             "success": result.get("result") == "ok",
@@ -183,16 +256,14 @@ def delete_multiple_media(public_ids: List[str], resource_type: str = "video") -
     Returns:
         Dict with deletion results
     """
-    # Re-initialize to ensure latest env vars are used
-    init_cloudinary()
+    settings = init_cloudinary()
     
     if not public_ids:
         return {"success": True, "deleted": [], "failed": []}
     
     try:
-        result = cloudinary.api.delete_resources(
-            public_ids,
-            resource_type=resource_type
+        result = _call_with_retries(
+            settings, "delete_resources", cloudinary.api.delete_resources, public_ids, resource_type=resource_type
         )
         
         deleted = result.get("deleted", {})
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+import os
+import traceback
+
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from models import Job, Media, Post
+from services import mux_service
+from services.media_cleanup import delete_provider_media
+from cache import invalidate_posts
+
+# Retry backoff: JOB_BACKOFF_BASE * 2^(attempt - 1) seconds, capped at JOB_BACKOFF_MAX
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "10"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "3600"))
+# A running job whose worker died is handed out again after this many seconds
+JOB_LOCK_TIMEOUT = float(os.getenv("JOB_LOCK_TIMEOUT", "600"))
+
+# Job kinds
+DELETE_PROVIDER_MEDIA = "delete_provider_media"
+RESOLVE_MUX_MEDIA = "resolve_mux_media"
+
+
+class JobRetry(Exception):
+    """
+    Raised by a handler to reschedule its job with backoff
+    payload, if given, replaces the job's payload (e.g. only the items still left to do)
+    """
+
+    def __init__(self, message: str, payload: Optional[dict] = None):
+        super().__init__(message)
+        self.payload = payload
+
+
+_handlers: Dict[str, Callable[[Session, dict], None]] = {}
+
+
+def job_handler(kind: str):
+    """Register the function executing jobs of the given kind"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(db: Session, kind: str, payload: dict) -> Job:
+    """
+    Add a job to the session; it becomes visible to workers when the caller commits,
+    so it is never run for a transaction that was rolled back
+    """
+    job = Job(kind=kind, payload=payload)
+    db.add(job)
+    return job
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(JOB_BACKOFF_BASE * (2 ** max(attempts - 1, 0)), JOB_BACKOFF_MAX)
+
+
+def claim_jobs(db: Session, limit: int) -> List:
+    """
+    Atomically mark up to `limit` due jobs as running and return them
+    FOR UPDATE SKIP LOCKED lets several workers poll the table concurrently
+    """
+    # Requeue jobs abandoned by a crashed worker
+    db.execute(
+        update(Job)
+        .where(Job.status == 'running', Job.locked_at < func.now() - timedelta(seconds=JOB_LOCK_TIMEOUT))
+        .values(status='pending', locked_at=None)
+    )
+    due = (
+        select(Job.id)
+        .where(Job.status == 'pending', Job.run_at <= func.now())
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = db.execute(
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()))
+        .values(status='running', attempts=Job.attempts + 1, locked_at=func.now())
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+    ).all()
+    db.commit()
+    return jobs
+
+
+def run_job(db: Session, job) -> bool:
+    """Execute one claimed job, recording success, retry or failure. Returns True on success"""
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind '{job.kind}'")
+        handler(db, job.payload)
+        db.execute(update(Job).where(Job.id == job.id).values(status='done', locked_at=None, last_error=None))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        values = {"locked_at": None, "last_error": str(e) if isinstance(e, JobRetry) else traceback.format_exc()}
+        if isinstance(e, JobRetry) and e.payload is not None:
+            values["payload"] = e.payload
+        if job.attempts >= job.max_attempts:
+            values["status"] = 'failed'
+            print(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {e}")
+        else:
+            values["status"] = 'pending'
+            values["run_at"] = func.now() + timedelta(seconds=backoff_seconds(job.attempts))
+            print(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying: {e}")
+        db.execute(update(Job).where(Job.id == job.id).values(**values))
+        db.commit()
+        return False
+
+
+@job_handler(DELETE_PROVIDER_MEDIA)
+def _delete_provider_media_job(db: Session, payload: dict):
+    """payload: {"refs": [...]} as built by services.media_cleanup.media_refs"""
+    refs = payload.get("refs", [])
+    results = delete_provider_media(refs)
+    failed = {(r["provider"], r["public_id"]) for r in results if not r["success"]}
+    remaining = [ref for ref in refs if (ref["provider"], ref["public_id"]) in failed]
+    if remaining:
+        raise JobRetry(f"{len(remaining)} of {len(refs)} provider deletes failed", payload={"refs": remaining})
+
+
+@job_handler(RESOLVE_MUX_MEDIA)
+def _resolve_mux_media_job(db: Session, payload: dict):
+    """
+    payload: {"post_id": ...}
+    Replace the direct upload IDs stored on a post's Mux media with the asset's playback ID
+    """
+    post_id = payload["post_id"]
+    pending = [
+        m for m in db.query(Media).filter(Media.post_id == post_id, Media.provider == "mux").all()
+        if not (m.meta_data or {}).get("asset_id")
+    ]
+    upload_ids = {m.id: (m.meta_data or {}).get("upload_id") or m.public_id for m in pending}
+    resolved = mux_service.resolve_uploads(list(upload_ids.values()))
+    unresolved = 0
+    for media in pending:
+        details = resolved.get(upload_ids[media.id])
+        if not details:
+            unresolved += 1
+            continue
+        media.public_id = details["playback_id"]
+        media.url = mux_service.get_playback_url(details["playback_id"])
+        if details.get("duration") and not media.duration:
+            media.duration = details["duration"]
+        media.meta_data = {**(media.meta_data or {}), "upload_id": details["upload_id"], "asset_id": details["asset_id"]}
+
+    if len(pending) > unresolved:
+        db.query(Post).filter(Post.id == post_id).update({Post.updated_at: func.now()}, synchronize_session=False)
+        db.commit()
+        invalidate_posts(post_id)
+    if unresolved:
+        raise JobRetry(f"{unresolved} Mux upload(s) have no playable asset yet")
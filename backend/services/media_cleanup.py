@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import os
+
+from services.cloudinary_service import delete_multiple_media as delete_cloudinary_batch
+from services import mux_service
+
+# Max provider API calls in flight for one cleanup
+PROVIDER_DELETE_CONCURRENCY = int(os.getenv("PROVIDER_DELETE_CONCURRENCY", "8"))
+# Cloudinary's delete_resources accepts at most 100 public IDs per call
+CLOUDINARY_BATCH_SIZE = 100
+
+
+def media_refs(media_items) -> List[Dict]:
+    """
+    Snapshot the provider identifiers of Media rows
+    The result is plain data, usable after the rows are deleted or the session is closed
+    """
+    refs = []
+    for m in media_items:
+        meta = m.meta_data if isinstance(m.meta_data, dict) else {}
+        asset_id = meta.get("asset_id")
+        # Unresolved Mux media still carry the direct upload ID as public_id
+        upload_id = meta.get("upload_id") or (m.public_id if m.provider == "mux" and not asset_id else None)
+        refs.append({
+            "provider": m.provider,
+            "type": m.type,
+            "public_id": m.public_id,
+            "asset_id": asset_id,
+            "upload_id": upload_id,
+        })
+    return refs
+
+
+def _delete_cloudinary_chunk(public_ids: List[str], resource_type: str) -> List[Dict]:
+    result = delete_cloudinary_batch(public_ids, resource_type=resource_type)
+    deleted = set(result.get("deleted", []))
+    error = result.get("error")
+    return [
+        {
+            "provider": "cloudinary",
+            "public_id": public_id,
+            "success": public_id in deleted,
+            **({"error": error} if error and public_id not in deleted else {}),
+        }
+        for public_id in public_ids
+    ]
+
+
+def _delete_mux_asset(public_id: str, asset_id: str) -> List[Dict]:
+    try:
+        success = mux_service.delete_asset(asset_id)
+        return [{"provider": "mux", "public_id": public_id, "asset_id": asset_id, "success": success}]
+    except Exception as e:
+        return [{"provider": "mux", "public_id": public_id, "asset_id": asset_id, "success": False, "error": str(e)}]
+
+
+def _delete_mux_upload(public_id: str, upload_id: str) -> List[Dict]:
+    """Delete the asset created from a direct upload that was never resolved"""
+    try:
+        upload = mux_service.get_upload_details(upload_id)
+        if upload.get("asset_id"):
+            return _delete_mux_asset(public_id, upload["asset_id"])
+        if upload.get("status") in ("cancelled", "errored", "timed_out"):
+            # No asset was ever created, nothing to delete
+            return [{"provider": "mux", "public_id": public_id, "success": True}]
+        return [{"provider": "mux", "public_id": public_id, "success": False, "error": "asset not created yet"}]
+    except Exception as e:
+        return [{"provider": "mux", "public_id": public_id, "success": False, "error": str(e)}]
+
+
+def delete_provider_media(refs: List[Dict]) -> List[Dict]:
+    """
+    Delete media from Cloudinary / Mux
+    Cloudinary items are grouped by resource type and deleted in batches; Mux assets
+    one call each. Calls run concurrently, bounded by PROVIDER_DELETE_CONCURRENCY.
+    Returns one result dict per deleted item (failures are logged, never raised)
+    """
+    cloudinary_ids: Dict[str, List[str]] = {}
+    tasks = []
+    for ref in refs:
+        if ref["provider"] == "cloudinary" and ref["public_id"]:
+            resource_type = "video" if ref["type"] == "video" else "image"
+            cloudinary_ids.setdefault(resource_type, []).append(ref["public_id"])
+        elif ref["provider"] == "mux" and ref.get("asset_id"):
+            tasks.append((_delete_mux_asset, ref["public_id"], ref["asset_id"]))
+        elif ref["provider"] == "mux" and ref.get("upload_id"):
+            tasks.append((_delete_mux_upload, ref["public_id"], ref["upload_id"]))
+
+    for resource_type, public_ids in cloudinary_ids.items():
+        for start in range(0, len(public_ids), CLOUDINARY_BATCH_SIZE):
+            tasks.append((_delete_cloudinary_chunk, public_ids[start:start + CLOUDINARY_BATCH_SIZE], resource_type))
+
+    if not tasks:
+        return []
+
+    results: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=min(PROVIDER_DELETE_CONCURRENCY, len(tasks))) as executor:
+        for items in executor.map(lambda task: task[0](*task[1:]), tasks):
+            results.extend(items)
+
+    for item in results:
+        if not item["success"]:
+            print(f"Warning: Failed to delete {item['provider']} media {item['public_id']}: {item.get('error', 'not deleted')}")
+    return results
@@ -1,36 +1,78 @@
 import mux_python
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
 from pathlib import Path
 from dotenv import load_dotenv
 
+from metrics import provider_call
+
 # Load .env file
 env_path = Path(__file__).parent.parent / '.env'
 if env_path.exists():
     load_dotenv(env_path)
 
-# Initialize Mux configuration
-def get_mux_client():
-    token_id = os.getenv("MUX_TOKEN_ID")
-    token_secret = os.getenv("MUX_TOKEN_SECRET")
-    
-    if not token_id or not token_secret:
-        return None
-        
-    configuration = mux_python.Configuration()
-    configuration.username = token_id
-    configuration.password = token_secret
-    return configuration
+# Max pooled keep-alive connections to the Mux API per worker process
+MUX_CONNECTION_POOL_SIZE = int(os.getenv("MUX_CONNECTION_POOL_SIZE", "10"))
+
+
+class _MuxClientHolder:
+    """
+    Long-lived, thread-safe mux_python.ApiClient
+    Built lazily on first use and rebuilt when MUX_TOKEN_ID / MUX_TOKEN_SECRET change,
+    so every call shares one urllib3 connection pool (keep-alive, no TLS handshake per call)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._credentials = None
+
+    def get(self) -> Optional[mux_python.ApiClient]:
+        credentials = (os.getenv("MUX_TOKEN_ID"), os.getenv("MUX_TOKEN_SECRET"))
+        if not credentials[0] or not credentials[1]:
+            return None
+        if self._client is not None and self._credentials == credentials:
+            return self._client
+        with self._lock:
+            if self._client is None or self._credentials != credentials:
+                configuration = mux_python.Configuration()
+                configuration.username, configuration.password = credentials
+                configuration.connection_pool_maxsize = MUX_CONNECTION_POOL_SIZE
+                self._client = mux_python.ApiClient(configuration)
+                self._credentials = credentials
+            return self._client
+
+    def reload(self) -> None:
+        """Drop the cached client; the next call builds a new one"""
+        with self._lock:
+            self._client = None
+            self._credentials = None
+
+
+_client_holder = _MuxClientHolder()
+
+
+def get_mux_client() -> Optional[mux_python.ApiClient]:
+    """Shared Mux API client, or None if credentials are not configured"""
+    return _client_holder.get()
+
+
+def reload_mux_client() -> None:
+    _client_holder.reload()
+
 
 def create_direct_upload() -> Dict:
     """
     Create a direct upload URL for the frontend
     """
-    config = get_mux_client()
-    if not config:
+    client = get_mux_client()
+    if not client:
         raise ValueError("Mux configuration missing (MUX_TOKEN_ID/MUX_TOKEN_SECRET)")
     
-    uploads_api = mux_python.DirectUploadsApi(mux_python.ApiClient(config))
+    uploads_api = mux_python.DirectUploadsApi(client)
     
     create_asset_request = mux_python.CreateAssetRequest(
         playback_policy=[mux_python.PlaybackPolicy.PUBLIC],
@@ -43,7 +85,8 @@ def create_direct_upload() -> Dict:
         cors_origin="*" # You might want to restrict this in production
     )
     
-    api_response = uploads_api.create_direct_upload(create_upload_request)
+    with provider_call("mux", "create_direct_upload"):
+        api_response = uploads_api.create_direct_upload(create_upload_request)
     
     return {
         "upload_url": api_response.data.url,
@@ -55,12 +98,13 @@ def get_upload_details(upload_id: str) -> Dict:
     """
     Get details about a direct upload
     """
-    config = get_mux_client()
-    if not config:
+    client = get_mux_client()
+    if not client:
         return {}
     
-    uploads_api = mux_python.DirectUploadsApi(mux_python.ApiClient(config))
-    api_response = uploads_api.get_direct_upload(upload_id)
+    uploads_api = mux_python.DirectUploadsApi(client)
+    with provider_call("mux", "get_direct_upload"):
+        api_response = uploads_api.get_direct_upload(upload_id)
     
     return {
         "id": api_response.data.id,
@@ -72,12 +116,13 @@ def get_asset_details(asset_id: str) -> Dict:
     """
     Get asset details including playback ID
     """
-    config = get_mux_client()
-    if not config:
+    client = get_mux_client()
+    if not client:
         return {}
     
-    assets_api = mux_python.AssetsApi(mux_python.ApiClient(config))
-    api_response = assets_api.get_asset(asset_id)
+    assets_api = mux_python.AssetsApi(client)
+    with provider_call("mux", "get_asset"):
+        api_response = assets_api.get_asset(asset_id)
     
     playback_id = None
     if api_response.data.playback_ids:
@@ -96,18 +141,85 @@ def delete_asset(asset_id: str) -> bool:
     """
     Delete asset from Mux
     """
-    config = get_mux_client()
-    if not config:
+    client = get_mux_client()
+    if not client:
         return False
     
-    assets_api = mux_python.AssetsApi(mux_python.ApiClient(config))
+    assets_api = mux_python.AssetsApi(client)
     try:
-        assets_api.delete_asset(asset_id)
+        with provider_call("mux", "delete_asset"):
+            assets_api.delete_asset(asset_id)
         return True
     except Exception as e:
         print(f"Error deleting Mux asset {asset_id}: {e}")
         return False
 
+# Upload -> asset and asset -> playback mappings never change once Mux assigns them,
+# so resolved values are cached (bounded LRU) for the life of the process
+MUX_RESOLVE_CONCURRENCY = int(os.getenv("MUX_RESOLVE_CONCURRENCY", "8"))
+MUX_RESOLVE_CACHE_SIZE = 1024
+_upload_assets: "OrderedDict[str, str]" = OrderedDict()
+_asset_details: "OrderedDict[str, Dict]" = OrderedDict()
+_resolve_cache_lock = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict, key: str):
+    with _resolve_cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: OrderedDict, key: str, value) -> None:
+    with _resolve_cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > MUX_RESOLVE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _resolve_upload(upload_id: str) -> Optional[Dict]:
+    asset_id = _cache_get(_upload_assets, upload_id)
+    if asset_id is None:
+        asset_id = get_upload_details(upload_id).get("asset_id")
+        if not asset_id:
+            return None
+        _cache_put(_upload_assets, upload_id, asset_id)
+
+    details = _cache_get(_asset_details, asset_id)
+    if details is None:
+        details = get_asset_details(asset_id)
+        if not details.get("playback_id"):
+            return None
+        # Duration etc. are only final once the asset is ready
+        if details.get("status") == "ready":
+            _cache_put(_asset_details, asset_id, details)
+    return {**details, "upload_id": upload_id, "asset_id": asset_id}
+
+
+def resolve_uploads(upload_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Resolve direct upload IDs to their asset details (asset_id, playback_id, duration, ...)
+    Lookups run concurrently (MUX_RESOLVE_CONCURRENCY) and known mappings are served from cache.
+    Uploads without a playable asset yet, or whose lookup failed, are omitted from the result
+    """
+    unique_ids = list(dict.fromkeys(u for u in upload_ids if u))
+    if not unique_ids:
+        return {}
+
+    def resolve(upload_id: str):
+        try:
+            return upload_id, _resolve_upload(upload_id)
+        except Exception as e:
+            print(f"Error resolving Mux upload {upload_id}: {e}")
+            return upload_id, None
+
+    with ThreadPoolExecutor(max_workers=min(MUX_RESOLVE_CONCURRENCY, len(unique_ids))) as executor:
+        results = executor.map(resolve, unique_ids)
+        return {upload_id: details for upload_id, details in results if details}
+
+
 def get_playback_url(playback_id: str) -> str:
     """
     Generate HLS playback URL
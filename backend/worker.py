@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Background job worker: runs provider cleanup and Mux asset resolution queued in the jobs table.
+Usage: python worker.py
+Several workers can run side by side; jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+import os
+import time
+
+from database import SessionLocal
+from services.jobs import claim_jobs, run_job
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))  # seconds between polls when idle
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "10"))
+
+
+def run_pending_jobs() -> int:
+    """Claim and run one batch of due jobs, returning how many were claimed"""
+    db = SessionLocal()
+    try:
+        jobs = claim_jobs(db, JOB_BATCH_SIZE)
+        for job in jobs:
+            run_job(db, job)
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def main():
+    print(f"[WORKER] Started (poll interval {JOB_POLL_INTERVAL}s, batch size {JOB_BATCH_SIZE})")
+    while True:
+        try:
+            claimed = run_pending_jobs()
+        except Exception as e:
+            print(f"[WORKER ERROR] {e}")
+            claimed = 0
+        if not claimed:
+            time.sleep(JOB_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
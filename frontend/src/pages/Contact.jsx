@@ -27,7 +27,8 @@ function Contact() {
         client_email: formData.email,
         start_time: now.toISOString(),
         end_time: endTime.toISOString(),
-        status: 'pending',
+        // Messages don't reserve the time slot (only pending/confirmed bookings do)
+        status: 'inquiry',
         message: formData.message || null
       })
 